@@ -1,72 +1,246 @@
 # A3.py
 # CSIT121 Assignment 3
 from abc import ABC, abstractmethod
+import atexit
+import bisect
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from collections import Counter, OrderedDict, deque
+from collections.abc import Sequence
+import copy
+import functools
+import gc
+import heapq
+import operator
 import os
 import json
+import mmap
 import re
+import struct
+import sys
+import tempfile
+import time
+import zipfile
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import numpy as np
 
+# -----------------------
+# Instrumentation
+# -----------------------
+
+def instrumented(fn=None, io=None):
+    """Mark a method for Metrics. Marking costs nothing: the timing wrapper is only
+    swapped in by Metrics.enable(). io="read"/"write" also counts file bytes."""
+    def mark(f):
+        f._instrument = io or ""
+        return f
+    return mark(fn) if fn is not None else mark
+
+
+def _file_bytes(paths):
+    if isinstance(paths, str):
+        paths = [paths]
+    return sum(os.path.getsize(p) for p in paths
+               if isinstance(p, str) and os.path.isfile(p))
+
+
+class Metrics:
+    """Opt-in per-operation call counts, latency percentiles and bytes read/written."""
+
+    enabled = False
+    SAMPLES = 10000             # latencies kept per operation for the percentiles
+    _ops = {}                   # operation name -> stats dict
+    _originals = []             # (class, attribute, original) while enabled
+    _classes = []               # classes whose marked methods get wrapped
+
+    @classmethod
+    def watch(cls, klass):
+        """Class decorator: include klass's @instrumented methods."""
+        cls._classes.append(klass)
+        return klass
+
+    @classmethod
+    def enable(cls):
+        """Swap timing wrappers in for every @instrumented method."""
+        if cls.enabled:
+            return
+        for klass in cls._classes:
+            for attr, value in list(vars(klass).items()):
+                kind = type(value) if isinstance(value, (staticmethod, classmethod)) else None
+                fn = value.__func__ if kind else value
+                io = getattr(fn, "_instrument", None)
+                if io is None:
+                    continue
+                wrapped = cls._wrap(fn, f"{klass.__name__}.{attr}", io)
+                cls._originals.append((klass, attr, value))
+                setattr(klass, attr, kind(wrapped) if kind else wrapped)
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls):
+        """Restore the original (unwrapped) methods; collected data is kept."""
+        for klass, attr, value in reversed(cls._originals):
+            setattr(klass, attr, value)
+        cls._originals = []
+        cls.enabled = False
+
+    @classmethod
+    def reset(cls):
+        cls._ops = {}
+
+    @classmethod
+    def _wrap(cls, fn, name, io):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException:
+                cls.record(name, time.perf_counter() - start, error=True)
+                raise
+            elapsed = time.perf_counter() - start
+            read = written = 0
+            if io == "read":
+                paths = kwargs.get("filepath", kwargs.get("paths"))
+                if paths is None:
+                    paths = next((a for a in args if isinstance(a, (str, list))), None)
+                read = _file_bytes(paths) if paths else 0
+            elif io == "write":
+                written = _file_bytes(result) if isinstance(result, str) else 0
+            cls.record(name, elapsed, read, written)
+            return result
+        return wrapper
+
+    @classmethod
+    def record(cls, name, seconds, bytes_read=0, bytes_written=0, error=False):
+        op = cls._ops.get(name)
+        if op is None:
+            op = cls._ops[name] = {"calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0,
+                                   "bytes_read": 0, "bytes_written": 0,
+                                   "samples": deque(maxlen=cls.SAMPLES)}
+        op["calls"] += 1
+        op["errors"] += error
+        op["total_s"] += seconds
+        op["max_s"] = max(op["max_s"], seconds)
+        op["bytes_read"] += bytes_read
+        op["bytes_written"] += bytes_written
+        op["samples"].append(seconds)
+
+    @classmethod
+    def snapshot(cls):
+        """Return {operation: calls, errors, total/max seconds, p50/p95/p99 ms and bytes}."""
+        out = {}
+        for name, op in sorted(cls._ops.items()):
+            p50, p95, p99 = np.percentile(np.fromiter(op["samples"], dtype=float),
+                                          (50, 95, 99)) * 1000
+            out[name] = {"calls": op["calls"], "errors": op["errors"], "total_s": op["total_s"],
+                         "max_s": op["max_s"], "p50_ms": p50, "p95_ms": p95,
+                         "p99_ms": p99, "bytes_read": op["bytes_read"],
+                         "bytes_written": op["bytes_written"]}
+        return out
+
+    @classmethod
+    def report(cls):
+        """Return the metrics as a printable table."""
+        rows = [f"{'operation':<34}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}"
+                f"{'p99 ms':>10}{'read B':>12}{'written B':>12}"]
+        for name, m in cls.snapshot().items():
+            rows.append(f"{name:<34}{m['calls']:>8}{m['p50_ms']:>10.3f}{m['p95_ms']:>10.3f}"
+                        f"{m['p99_ms']:>10.3f}{m['bytes_read']:>12}{m['bytes_written']:>12}")
+        return "\n".join(rows)
+
 # -----------------------
 # Stats
 # -----------------------
 
 class Stats:
-    """Encapsulates the six main stats of a Pokémon."""
+    """Encapsulates the six main stats of a Pokémon.
+
+    A Stats object keeps its own values until it is attached to a StatsStore,
+    after which it becomes a view onto one row of the store."""
+
+    __slots__ = ("__values", "__store", "__row")
+
+    FIELDS = ("hp", "attack", "defense", "sp_atk", "sp_def", "speed")
+    _INDEX = {f: i for i, f in enumerate(FIELDS)}
+
     def __init__(self, hp, attack, defense, sp_atk, sp_def, speed):
         """Initialize all six stats."""
-        self.__hp = int(hp)
-        self.__attack = int(attack)
-        self.__defense = int(defense)
-        self.__sp_atk = int(sp_atk)
-        self.__sp_def = int(sp_def)
-        self.__speed = int(speed)
-        for v in (self.__hp, self.__attack, self.__defense,
-                  self.__sp_atk, self.__sp_def, self.__speed):
+        values = [int(hp), int(attack), int(defense),
+                  int(sp_atk), int(sp_def), int(speed)]
+        for v in values:
             if v < 0:
                 raise ValueError("All stats must be non-negative integers.")
+        self.__values = values
+        self.__store = None
+        self.__row = -1
 
     def set_stat(self, field, value):
         """Set the value of the specified stat."""
         v = int(value)
         if v < 0:
             raise ValueError("value must be non-negative.")
-        if field == "hp": self.__hp = v
-        elif field == "attack": self.__attack = v
-        elif field == "defense": self.__defense = v
-        elif field == "sp_atk": self.__sp_atk = v
-        elif field == "sp_def": self.__sp_def = v
-        elif field == "speed": self.__speed = v
-        else:
+        i = Stats._INDEX.get(field)
+        if i is None:
             raise AttributeError(f"Unknown stat '{field}'.")
+        if self.__store is not None:
+            self.__store.set_value(self.__row, i, v)
+        elif type(self.__values) is tuple:
+            raise TypeError("These stats belong to a Pokémon read lazily from a snapshot and "
+                            "are read-only; change them through the Pokédex (e.g. update_by_name).")
+        else:
+            self.__values[i] = v
 
     def get_stat(self, field):
         """Return the value of the specified stat."""
-        if field == "hp": return self.__hp
-        if field == "attack": return self.__attack
-        if field == "defense": return self.__defense
-        if field == "sp_atk": return self.__sp_atk
-        if field == "sp_def": return self.__sp_def
-        if field == "speed": return self.__speed
-        raise AttributeError(f"Unknown stat '{field}'.")
+        i = Stats._INDEX.get(field)
+        if i is None:
+            raise AttributeError(f"Unknown stat '{field}'.")
+        if self.__store is None:
+            return self.__values[i]
+        return int(self.__store.data[self.__row, i])
+
+    def get_values(self):
+        """Return the six stats as a list in FIELDS order."""
+        if self.__store is None:
+            return list(self.__values)
+        return self.__store.data[self.__row].tolist()
 
     def get_total(self):
         """Return total of all six stats."""
-        return (self.__hp + self.__attack + self.__defense +
-                self.__sp_atk + self.__sp_def + self.__speed)
+        return sum(self.get_values())
 
     def as_dict(self):
         """Return stats as a dictionary."""
-        return {
-            "hp": self.__hp,
-            "attack": self.__attack,
-            "defense": self.__defense,
-            "sp_atk": self.__sp_atk,
-            "sp_def": self.__sp_def,
-            "speed": self.__speed,
-            "total": self.get_total()
-        }
+        values = self.get_values()
+        d = dict(zip(Stats.FIELDS, values))
+        d["total"] = sum(values)
+        return d
     
+    # Copies and pickles hold the values only, never the store row
+    def __copy__(self):
+        return Stats.from_values(self.get_values())
+
+    def __deepcopy__(self, memo):
+        return Stats.from_values(self.get_values())
+
+    def __reduce__(self):
+        return Stats.from_values, (self.get_values(),)
+
+    @staticmethod
+    def from_values(values):
+        """Create a Stats object from six ints in FIELDS order, without re-converting them."""
+        if min(values) < 0:
+            raise ValueError("All stats must be non-negative integers.")
+        s = Stats.__new__(Stats)
+        s.__values = list(values)
+        s.__store = None
+        s.__row = -1
+        return s
+
     @staticmethod
     def from_dict(d):
         """Create a Stats object from a dictionary, with default value = 0."""
@@ -79,15 +253,376 @@ class Stats:
             d.get("speed", 0)
         )
 
+    # Store binding (used by StatsStore only)
+    def _bind(self, store, row, copy=True):
+        """Move the values into a store row and read/write through it
+        (copy=False when the caller has already written the row)."""
+        if copy:
+            store.data[row] = self.get_values()
+        self.__values = None
+        self.__store, self.__row = store, row
+
+    def _unbind(self):
+        """Copy the row back into the object and detach from the store."""
+        if self.__store is not None:
+            self.__values = self.get_values()
+            self.__store, self.__row = None, -1
+
+    def _location(self):
+        return self.__store, self.__row
+
+    def _freeze(self):
+        """Make unattached stats read-only (kept as a tuple until attached to a store)."""
+        if self.__store is None:
+            self.__values = tuple(self.__values)
+
+
+class StatsStore:
+    """Columnar (N, 6) stats array plus a type-code column for vectorized aggregates."""
+
+    TOTAL = len(Stats.FIELDS)       # column number used for the sorted index on totals
+
+    def __init__(self, capacity=64):
+        self.data = np.zeros((capacity, len(Stats.FIELDS)), dtype=np.int64)
+        self.codes = np.full(capacity, -1, dtype=np.int32)   # -1 marks a free row
+        self.owners = np.full(capacity, -1, dtype=np.int64)  # handle of the entry owning each row
+        self.size = 0               # rows in use or freed, i.e. the high-water mark
+        self.type_codes = {}        # lowercase type name -> code
+        self.version = 0            # bumped on every change, for aggregate caches
+        # running per-type-code count, sums and sums of squares of each stat
+        self.counts, self.sums, self.sumsq = [], [], []
+        self._sorted = {}           # column -> ascending [(value, owner)], built on first use
+        self._free = []
+
+    def _grow(self):
+        capacity = len(self.data) * 2
+        data = np.zeros((capacity, self.data.shape[1]), dtype=self.data.dtype)
+        data[:self.size] = self.data[:self.size]
+        codes = np.full(capacity, -1, dtype=self.codes.dtype)
+        codes[:self.size] = self.codes[:self.size]
+        owners = np.full(capacity, -1, dtype=self.owners.dtype)
+        owners[:self.size] = self.owners[:self.size]
+        self.data, self.codes, self.owners = data, codes, owners
+
+    def code_for(self, type_key):
+        """Return the integer code for a type name, registering it if new."""
+        code = self.type_codes.get(type_key)
+        if code is None:
+            code = self.type_codes[type_key] = len(self.type_codes)
+            self.counts.append(0)
+            self.sums.append([0] * len(Stats.FIELDS))
+            self.sumsq.append([0] * len(Stats.FIELDS))
+        return code
+
+    def _add_moments(self, code, values, sign):
+        sums, sumsq = self.sums[code], self.sumsq[code]
+        for i, v in enumerate(values):
+            sums[i] += sign * v
+            sumsq[i] += sign * v * v
+        self.counts[code] += sign
+
+    @staticmethod
+    def _check_unattached(stats_list):
+        """Raise ValueError if a Stats object already has a row (e.g. it is shared
+        with another Pokémon), or appears twice: a second row would orphan the first."""
+        seen = set()
+        for stats in stats_list:
+            if stats._location()[0] is not None or id(stats) in seen:
+                raise ValueError("Stats object is already attached to another Pokémon; "
+                                 "give each Pokémon its own Stats.")
+            seen.add(id(stats))
+
+    def attach(self, stats, type_key, owner=-1):
+        """Give a Stats object a row in the store and return the row number.
+        owner is recorded for mapping rows back to entries (the Pokédex handle)."""
+        StatsStore._check_unattached((stats,))
+        if self._free:
+            row = self._free.pop()
+        else:
+            if self.size == len(self.data):
+                self._grow()
+            row = self.size
+            self.size += 1
+        stats._bind(self, row)
+        code = self.codes[row] = self.code_for(type_key)
+        self.owners[row] = owner
+        self._add_moments(code, self.data[row].tolist(), 1)
+        self._index_row(row, self._sorted, insert=True)
+        self.version += 1
+        return row
+
+    def attach_many(self, stats_list, type_keys, owners):
+        """Attach many Stats objects at once: one block write to new rows and one
+        running-moments and sorted-index update. Returns the first row used."""
+        StatsStore._check_unattached(stats_list)
+        n = len(stats_list)
+        start = self.size
+        while start + n > len(self.data):
+            self._grow()
+        values = np.array([s.get_values() for s in stats_list], dtype=np.int64)
+        values = values.reshape(n, len(Stats.FIELDS))
+        codes = np.array([self.code_for(k) for k in type_keys], dtype=self.codes.dtype)
+        self.data[start:start + n] = values
+        self.codes[start:start + n] = codes
+        self.owners[start:start + n] = owners
+        self.size += n
+        for row, stats in enumerate(stats_list, start):
+            stats._bind(self, row, copy=False)
+
+        squares = values * values
+        for code in np.unique(codes).tolist():
+            mask = codes == code
+            self.counts[code] += int(mask.sum())
+            self.sums[code] = [a + b for a, b in zip(self.sums[code], values[mask].sum(axis=0).tolist())]
+            self.sumsq[code] = [a + b for a, b in zip(self.sumsq[code], squares[mask].sum(axis=0).tolist())]
+        for column, index in self._sorted.items():
+            col = values.sum(axis=1) if column == StatsStore.TOTAL else values[:, column]
+            index.extend(zip(col.tolist(), list(owners)))
+            index.sort()
+        self.version += 1
+        return start
+
+    def release(self, stats):
+        """Detach a Stats object and free its row."""
+        store, row = stats._location()
+        if store is not self:
+            return
+        stats._unbind()
+        self._add_moments(int(self.codes[row]), self.data[row].tolist(), -1)
+        self._index_row(row, self._sorted, insert=False)
+        self.data[row] = 0
+        self.codes[row] = -1
+        self.owners[row] = -1
+        self._free.append(row)
+        self.version += 1
+
+    def set_value(self, row, i, v):
+        """Write one stat and adjust the running sums of the row's type in O(1)."""
+        old = int(self.data[row, i])
+        touched = {c: self._sorted[c] for c in (i, StatsStore.TOTAL) if c in self._sorted}
+        self._index_row(row, touched, insert=False)
+        self.data[row, i] = v
+        self._index_row(row, touched, insert=True)
+        code = self.codes[row]
+        self.sums[code][i] += v - old
+        self.sumsq[code][i] += v * v - old * old
+        self.version += 1
+
+    # Sorted indexes
+    def _value(self, row, column):
+        if column == StatsStore.TOTAL:
+            return int(self.data[row].sum())
+        return int(self.data[row, column])
+
+    def _index_row(self, row, indexes, insert):
+        """Insert a row's (value, owner) keys into, or remove them from, sorted indexes."""
+        owner = int(self.owners[row])
+        for column, index in indexes.items():
+            key = (self._value(row, column), owner)
+            if insert:
+                bisect.insort(index, key)
+            else:
+                del index[bisect.bisect_left(index, key)]
+
+    def sorted_index(self, column):
+        """Return the ascending list of (value, owner) for a stat column (or TOTAL).
+        Built on first use, then kept up to date by attach, release and set_value."""
+        index = self._sorted.get(column)
+        if index is None:
+            used = np.flatnonzero(self.codes[:self.size] >= 0)
+            if column == StatsStore.TOTAL:
+                values = self.data[used].sum(axis=1)
+            else:
+                values = self.data[used, column]
+            index = self._sorted[column] = sorted(zip(values.tolist(), self.owners[used].tolist()))
+        return index
+
+    def owners_in_range(self, column, low=None, high=None):
+        """Owners with low <= value <= high (either bound optional), ascending by value."""
+        index = self.sorted_index(column)
+        start = 0 if low is None else bisect.bisect_left(index, (low,))
+        stop = len(index) if high is None else bisect.bisect_right(index, (high, float("inf")))
+        return [owner for _, owner in index[start:stop]]
+
+    def top_owners(self, column, k):
+        """Owners of the k highest values, descending; ties keep ascending owner order."""
+        index = self.sorted_index(column)
+        result, stop = [], len(index)
+        while stop and len(result) < k:
+            start = bisect.bisect_left(index, (index[stop - 1][0],))
+            result.extend(owner for _, owner in index[start:stop])
+            stop = start
+        return result[:k]
+
+    def moments(self, type_key=None):
+        """Return (count, sums, sums of squares) for a type, or for all types."""
+        if type_key is not None:
+            code = self.type_codes.get(type_key)
+            if code is None:
+                return 0, [0] * len(Stats.FIELDS), [0] * len(Stats.FIELDS)
+            return self.counts[code], list(self.sums[code]), list(self.sumsq[code])
+        return (sum(self.counts),
+                [sum(col) for col in zip(*self.sums)] or [0] * len(Stats.FIELDS),
+                [sum(col) for col in zip(*self.sumsq)] or [0] * len(Stats.FIELDS))
+
+    @staticmethod
+    def describe(count, sums, sumsq):
+        """Turn running moments into mean, (population) variance and std per stat."""
+        if count == 0:
+            return None
+        mean = [s / count for s in sums]
+        # exact integer numerator, so no cancellation error
+        variance = [(count * q - s * s) / (count * count) for s, q in zip(sums, sumsq)]
+        return {
+            "count": count,
+            "mean": dict(zip(Stats.FIELDS, mean)),
+            "variance": dict(zip(Stats.FIELDS, variance)),
+            "std": dict(zip(Stats.FIELDS, (v ** 0.5 for v in variance))),
+        }
+
+    def mask(self, type_key=None):
+        """Boolean mask over used rows, optionally restricted to one type."""
+        codes = self.codes[:self.size]
+        if type_key is None:
+            return codes >= 0
+        code = self.type_codes.get(type_key)
+        if code is None:
+            return np.zeros(self.size, dtype=bool)
+        return codes == code
+
+    def rows(self, type_key=None):
+        """Return the (k, 6) stats rows for a type (or all types)."""
+        return self.data[:self.size][self.mask(type_key)]
+
+    def summary(self, type_key=None, percentiles=(25, 50, 75)):
+        """Vectorized count/sum/mean/min/max/percentiles per stat and for the total."""
+        return StatsStore.summarize(self.rows(type_key), percentiles)
+
+    @staticmethod
+    def summarize(rows, percentiles=(25, 50, 75)):
+        """Summarize any (k, 6) array of stats rows."""
+        if len(rows) == 0:
+            return None
+        totals = rows.sum(axis=1)
+        columns = list(Stats.FIELDS) + ["total"]
+        table = np.column_stack((rows, totals))
+
+        def named(values):
+            return dict(zip(columns, values.tolist()))
+
+        result = {
+            "count": len(rows),
+            "sum": named(table.sum(axis=0)),
+            "mean": named(table.mean(axis=0)),
+            "min": named(table.min(axis=0)),
+            "max": named(table.max(axis=0)),
+        }
+        if percentiles:
+            pct = np.percentile(table, percentiles, axis=0)
+            result["percentiles"] = {p: named(pct[i]) for i, p in enumerate(percentiles)}
+        return result
 
 
 # -----------------------
 # «Abstract» BasePokemon
 # -----------------------
 
+def _intern(text):
+    """Share one copy of strings that repeat across many Pokémon (species, abilities)."""
+    return sys.intern(text) if type(text) is str else text
+
+def _intern_all(items):
+    return tuple(map(_intern, items))
+
+
+class TypeRegistry:
+    """Lookup tables for Pokémon types and classes, filled in automatically as
+    BasePokemon subclasses are defined (see BasePokemon.__init_subclass__).
+
+    An abstract type class is one that lists ABC among its bases and sets
+    TYPE_NAME/TYPE_INFO (e.g. FireType). A concrete class with GENERIC = True
+    is used for user-created Pokémon of its type; other concrete classes are
+    matched by Pokémon name (e.g. Charmander)."""
+
+    _types = {}         # lowercase type name -> abstract type class
+    _generic = {}       # lowercase type name -> generic concrete class
+    _named = {}         # lowercase Pokémon name -> concrete class
+    _classes = {}       # class name -> concrete class
+
+    @classmethod
+    def register(cls, klass):
+        type_name = klass.TYPE_NAME
+        if not type_name:
+            return
+        klass.TYPE_KEY = type_name.lower()
+        if ABC in klass.__bases__:
+            if "TYPE_NAME" in vars(klass):
+                cls._types[klass.TYPE_KEY] = klass
+            return
+        cls._classes[klass.__name__] = klass
+        if vars(klass).get("GENERIC"):
+            cls._generic[klass.TYPE_KEY] = klass
+        else:
+            cls._named[klass.__name__.lower()] = klass
+
+    @classmethod
+    def unregister(cls, klass):
+        """Remove a class from every table it was registered in (e.g. a type
+        defined only for a test)."""
+        for table in (cls._types, cls._generic, cls._named, cls._classes):
+            for key in [k for k, v in table.items() if v is klass]:
+                del table[key]
+
+    @classmethod
+    def type_names(cls):
+        """Return the display names of all registered types, alphabetically
+        (so menus and charts read "Fire vs Grass" as they always have)."""
+        return sorted(t.TYPE_NAME for t in cls._types.values())
+
+    @classmethod
+    def type_class(cls, type_name):
+        """Return the abstract class of a type (case-insensitive), or None."""
+        return cls._types.get(str(type_name).strip().lower())
+
+    @classmethod
+    def generic_class(cls, type_name):
+        """Return the class for user-created Pokémon of a type, or None."""
+        return cls._generic.get(str(type_name).strip().lower())
+
+    @classmethod
+    def class_for(cls, class_name, type_name):
+        """Return the class saved as class_name, falling back to the type's generic class."""
+        klass = cls._classes.get(class_name) or cls.generic_class(type_name)
+        if klass is None:
+            raise ValueError(f"Unknown Pokémon type: {str(type_name).lower()}")
+        return klass
+
+    @classmethod
+    def named_classes(cls):
+        """Return {lowercase Pokémon name: class} for Pokémon with their own class."""
+        return dict(cls._named)
+
+    @classmethod
+    def class_for_name(cls, name, type_name):
+        """Return the class for a Pokémon called name (own class first, then its type)."""
+        return cls._named.get(name.lower()) or cls.generic_class(type_name)
+
+
 class BasePokemon(ABC):
     """Abstract base class defining shared attributes and methods for all Pokémon."""
 
+    # No per-instance __dict__; subclasses declare empty __slots__ to keep it that way.
+    __slots__ = ("__national_no", "__name", "__species", "__height_m", "__weight_kg",
+                 "__abilities", "__stats")
+
+    TYPE_NAME = ""          # set by each type class (e.g. "Fire")
+    TYPE_KEY = ""           # lowercase TYPE_NAME, filled in by TypeRegistry
+    GENERIC = False         # True on the class used for user-created Pokémon of a type
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        TypeRegistry.register(cls)
+
     def __init__(self,
                  national_no="0", name="Unknown", species="???",
                  height_m=0.0, weight_kg=0.0,
@@ -95,10 +630,10 @@ class BasePokemon(ABC):
         """Initialize basic Pokémon information and stats."""
         self.__national_no = str(national_no)
         self.__name = name
-        self.__species = species
+        self.__species = _intern(species)
         self.__height_m = float(height_m)
         self.__weight_kg = float(weight_kg)
-        self.__abilities = abilities if abilities is not None else []
+        self.__abilities = _intern_all(abilities) if abilities is not None else ()
         self.__stats = stats if stats is not None else Stats(0, 0, 0, 0, 0, 0)
 
     # Getters
@@ -110,15 +645,24 @@ class BasePokemon(ABC):
     def get_abilities(self): return self.__abilities
     def get_stats(self): return self.__stats
 
+    def __copy__(self):
+        """Shallow copy with its own unattached Stats, so the copy can be added to a Pokédex."""
+        clone = type(self).__new__(type(self))
+        for slot in BasePokemon.__slots__:
+            name = "_BasePokemon" + slot
+            setattr(clone, name, getattr(self, name))
+        clone.__stats = copy.copy(self.__stats)
+        return clone
+
     # Basic info setter
     def set_basic_info(self, name, national_no, species, height_m, weight_kg, abilities):
         """Set the basic Pokémon information fields."""
         self.__name = name
         self.__national_no = str(national_no)
-        self.__species = species
+        self.__species = _intern(species)
         self.__height_m = float(height_m)
         self.__weight_kg = float(weight_kg)
-        self.__abilities = list(abilities)
+        self.__abilities = _intern_all(abilities)
 
     @abstractmethod
     def display(self):
@@ -149,7 +693,7 @@ class BasePokemon(ABC):
         """Convert the Pokémon object into a nested dictionary for JSON serialization."""
         return {
             "class": self.__class__.__name__,     
-            "type": getattr(self.__class__, "TYPE_NAME", ""),
+            "type": self.TYPE_NAME,
             "national_no": self.__national_no,
             "name": self.__name,
             "species": self.__species,
@@ -159,31 +703,47 @@ class BasePokemon(ABC):
             "stats": self.__stats.as_dict()           
         }
 
+    def to_record(self):
+        """Convert the Pokémon into a compact tuple (cheap to pickle between processes)."""
+        return (self.__class__.__name__, self.TYPE_NAME, self.__national_no, self.__name,
+                self.__species, self.__height_m, self.__weight_kg, self.__abilities,
+                tuple(self.__stats.get_values()))
+
     @staticmethod
-    def from_dict(d):
-        """Recreate a Pokémon object from a dictionary."""
-        class_name = d.get("class", "")
-        type_name = d.get("type", "").lower()
-
-        class_map = {
-            "Charmander": Charmander,
-            "Vulpix": Vulpix,
-            "Bulbasaur": Bulbasaur,
-            "Oddish": Oddish,
-            "GenericFirePokemon": GenericFirePokemon,
-            "GenericGrassPokemon": GenericGrassPokemon
-        }
+    def from_record(r):
+        """Recreate a Pokémon object from a to_record() tuple."""
+        klass = BasePokemon.class_for(r[0], r[1])
+        return klass(national_no=r[2], name=r[3], species=r[4], height_m=r[5],
+                     weight_kg=r[6], abilities=r[7], stats=Stats(*r[8]))
 
-        klass = class_map.get(class_name)
-        # If it's a new Pokémon not in the list, choose by type
-        if klass is None:
-            if type_name == "fire":
-                klass = GenericFirePokemon
-            elif type_name == "grass":
-                klass = GenericGrassPokemon
-            else:
-                raise ValueError(f"Unknown Pokémon type: {type_name}")
+    @staticmethod
+    def class_for(class_name, type_name):
+        """Return the concrete class for a saved class name, falling back to the type."""
+        return TypeRegistry.class_for(class_name, type_name)
+
+    @classmethod
+    def calculate_average(cls, pokemons):
+        """Calculate average stats for all Pokémon of this class's type
+        (pokemons may be a list or the Pokédex itself)."""
+        if isinstance(pokemons, Pokedex):
+            return pokemons.average_stats(cls.TYPE_NAME)
+        selected = [p for p in pokemons if p.TYPE_KEY == cls.TYPE_KEY]
+        if not selected:
+            return None
+
+        totals = {k: 0 for k in Stats.FIELDS}
+        for p in selected:
+            s = p.get_stats()
+            for k in totals:
+                totals[k] += s.get_stat(k)
+
+        count = len(selected)
+        return {k: round(v / count, 1) for k, v in totals.items()}
 
+    @staticmethod
+    def from_dict(d):
+        """Recreate a Pokémon object from a dictionary."""
+        klass = BasePokemon.class_for(d.get("class", ""), d.get("type", ""))
         return klass(
             national_no=d.get("national_no", "0000"),
             name=d.get("name", "Unknown"),
@@ -202,8 +762,9 @@ class BasePokemon(ABC):
 
 class GrassType(BasePokemon, ABC):
     """Abstract base class for all Grass-type Pokémon. 
-    Provides shared information and average-stat calculation."""
+    Provides shared information; calculate_average is inherited from BasePokemon."""
     
+    __slots__ = ()
     TYPE_NAME = "Grass"
     TYPE_INFO = (
         "Grass is one of the three basic elemental types along with Fire and Water, "
@@ -215,32 +776,13 @@ class GrassType(BasePokemon, ABC):
     def display(self):
         """Return Grass-type description (used in type report)."""
         return "[Type: Grass]\n" + GrassType.TYPE_INFO
-    
-
-    @classmethod
-    def calculate_average(cls, pokemons):
-        """Calculate average stats for all Grass-type Pokémon in the Pokédex."""
-        grass_pokemon = [
-            p for p in pokemons
-            if getattr(p.__class__, "TYPE_NAME", "").lower() == "grass"
-        ]
-        if not grass_pokemon:
-            return None
-
-        totals = {k: 0 for k in ["hp", "attack", "defense", "sp_atk", "sp_def", "speed"]}
-        for p in grass_pokemon:
-            s = p.get_stats()
-            for k in totals:
-                totals[k] += s.get_stat(k)
-
-        count = len(grass_pokemon)
-        return {k: round(v / count, 1) for k, v in totals.items()}
 
 
 class FireType(BasePokemon, ABC):
     """Abstract base class for all Fire-type Pokémon.
-    Provides shared information and average-stat calculation."""
+    Provides shared information; calculate_average is inherited from BasePokemon."""
     
+    __slots__ = ()
     TYPE_NAME = "Fire"
     TYPE_INFO = (
         "Fire is one of the three basic elemental types along with Water and Grass. "
@@ -252,25 +794,6 @@ class FireType(BasePokemon, ABC):
         """Return Fire-type description (used in type report)."""
         return "[Type: Fire]\n" + FireType.TYPE_INFO
 
-    @classmethod
-    def calculate_average(cls, pokemons):
-        """Calculate average stats for all Fire-type Pokémon in the Pokédex."""
-        fire_pokemon = [
-            p for p in pokemons
-            if getattr(p.__class__, "TYPE_NAME", "").lower() == "fire"
-        ]
-        if not fire_pokemon:
-            return None
-
-        totals = {k: 0 for k in ["hp", "attack", "defense", "sp_atk", "sp_def", "speed"]}
-        for p in fire_pokemon:
-            s = p.get_stats()
-            for k in totals:
-                totals[k] += s.get_stat(k)
-
-        count = len(fire_pokemon)
-        return {k: round(v / count, 1) for k, v in totals.items()}
-
 
 
 # -----------------------
@@ -278,6 +801,8 @@ class FireType(BasePokemon, ABC):
 # -----------------------
 
 class Oddish(GrassType):
+    __slots__ = ()
+
     def display(self):
         s = self.get_stats()
         return f"\nNational Number: {self.get_national_no()}\n" \
@@ -297,6 +822,8 @@ class Oddish(GrassType):
                f"  Total: {s.get_total()}"
 
 class Bulbasaur(GrassType):
+    __slots__ = ()
+
     def display(self):
         s = self.get_stats()
         return f"\nNational Number: {self.get_national_no()}\n" \
@@ -316,6 +843,8 @@ class Bulbasaur(GrassType):
                f"  Total: {s.get_total()}"
 
 class Charmander(FireType):
+    __slots__ = ()
+
     def display(self):
         s = self.get_stats()
         return f"\nNational Number: {self.get_national_no()}\n" \
@@ -335,6 +864,8 @@ class Charmander(FireType):
                f"  Total: {s.get_total()}"
 
 class Vulpix(FireType):
+    __slots__ = ()
+
     def display(self):
         s = self.get_stats()
         return f"\nNational Number: {self.get_national_no()}\n" \
@@ -355,6 +886,9 @@ class Vulpix(FireType):
 
 class GenericFirePokemon(FireType):
     """Generic Fire-type Pokémon created by the user."""
+    __slots__ = ()
+    GENERIC = True
+
     def display(self):
         s = self.get_stats()
         return f"\nNational Number: {self.get_national_no()}\n" \
@@ -375,6 +909,9 @@ class GenericFirePokemon(FireType):
 
 class GenericGrassPokemon(GrassType):
     """Generic Grass-type Pokémon created by the user."""
+    __slots__ = ()
+    GENERIC = True
+
     def display(self):
         s = self.get_stats()
         return f"\nNational Number: {self.get_national_no()}\n" \
@@ -405,10 +942,375 @@ class PokemonNotFoundError(Exception):
 
 
 
+# -----------------------
+# Atomic file writes
+# -----------------------
+
+@contextmanager
+def atomic_write(filepath, mode="w", encoding="utf-8"):
+    """Open a temporary file next to filepath and rename it over filepath on success,
+    so readers (and a crash) only ever see the old or the new complete file."""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+    try:
+        # mkstemp creates the file as 0600: keep the target's permissions, or use
+        # the umask default that open(filepath, "w") would have given a new file
+        try:
+            permissions = os.stat(filepath).st_mode & 0o7777
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            permissions = 0o666 & ~umask
+        os.chmod(tmp_path, permissions)
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def gc_paused():
+    """Pause the cyclic garbage collector while building many objects at once
+    (bulk imports create no reference cycles, so collections there are wasted)."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+
+# -----------------------
+# Binary snapshot
+# -----------------------
+
+class Snapshot:
+    """Read-only, memory-mapped view of a binary Pokédex snapshot (.pdx).
+
+    Layout (little-endian, sections aligned to 8 bytes):
+      header   magic b"PDXS", version, record/string/ability-ref counts
+      records  fixed-width rows: six stats, height, weight and string-table ids
+      ability  string ids referenced by each record's (start, count) range
+      offsets  n_strings + 1 byte offsets into the string blob
+      blob     UTF-8 text of every distinct name, species, ability, ...
+    """
+
+    MAGIC = b"PDXS"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHQQQ")
+    RECORD_DTYPE = np.dtype([
+        ("stats", "<i4", (len(Stats.FIELDS),)),
+        ("height_m", "<f8"),
+        ("weight_kg", "<f8"),
+        ("cls", "<u4"),
+        ("type", "<u4"),
+        ("national_no", "<u4"),
+        ("name", "<u4"),
+        ("species", "<u4"),
+        ("ab_start", "<u4"),
+        ("ab_count", "<u4"),
+    ])
+
+    @staticmethod
+    def _align(n):
+        return (n + 7) & ~7
+
+    @staticmethod
+    def write(filepath, pokemons):
+        """Write an iterable of Pokémon to filepath in snapshot format."""
+        strings, ids = [], {}
+
+        def sid(text):
+            i = ids.get(text)
+            if i is None:
+                i = ids[text] = len(strings)
+                strings.append(text)
+            return i
+
+        pokemons = list(pokemons)
+        records = np.zeros(len(pokemons), dtype=Snapshot.RECORD_DTYPE)
+        ability_refs = []
+        for i, p in enumerate(pokemons):
+            abilities = p.get_abilities()
+            records[i] = (p.get_stats().get_values(), p.get_height(), p.get_weight(),
+                          sid(p.__class__.__name__), sid(p.TYPE_NAME),
+                          sid(p.get_national_no()), sid(p.get_name()),
+                          sid(p.get_species()), len(ability_refs), len(abilities))
+            ability_refs.extend(sid(a) for a in abilities)
+
+        encoded = [t.encode("utf-8") for t in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        refs = np.array(ability_refs, dtype="<u4")
+
+        with atomic_write(filepath, "wb") as f:
+            f.write(Snapshot.HEADER.pack(Snapshot.MAGIC, Snapshot.VERSION, 0,
+                                         len(records), len(strings), len(refs)))
+            for section in (records.tobytes(), refs.tobytes(), offsets.tobytes()):
+                f.write(section)
+                f.write(b"\0" * (Snapshot._align(f.tell()) - f.tell()))
+            f.write(b"".join(encoded))
+
+    def __init__(self, filepath):
+        """Memory-map a snapshot file; no records are decoded until asked for."""
+        self.path = filepath
+        self._file = open(filepath, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, n, n_strings, n_refs = Snapshot.HEADER.unpack_from(self._mm, 0)
+        if magic != Snapshot.MAGIC or version != Snapshot.VERSION:
+            self.close()
+            raise ValueError(f"'{filepath}' is not a Pokédex snapshot.")
+
+        pos = Snapshot._align(Snapshot.HEADER.size)
+        self.records = np.frombuffer(self._mm, dtype=Snapshot.RECORD_DTYPE, count=n, offset=pos)
+        pos = Snapshot._align(pos + self.records.nbytes)
+        self._refs = np.frombuffer(self._mm, dtype="<u4", count=n_refs, offset=pos)
+        pos = Snapshot._align(pos + self._refs.nbytes)
+        self._offsets = np.frombuffer(self._mm, dtype="<u8", count=n_strings + 1, offset=pos)
+        self._blob = Snapshot._align(pos + self._offsets.nbytes)
+        self._ids = None        # text -> string id, built on first exact lookup
+        self._folded = None     # casefolded text -> [string ids], built on first folded lookup
+
+    def __len__(self):
+        return len(self.records)
+
+    def string(self, i):
+        """Decode string-table entry i."""
+        start = self._blob + int(self._offsets[i])
+        end = self._blob + int(self._offsets[i + 1])
+        return self._mm[start:end].decode("utf-8")
+
+    def record(self, i):
+        """Decode record i into a Pokémon object."""
+        r = self.records[i]
+        start, count = int(r["ab_start"]), int(r["ab_count"])
+        klass = BasePokemon.class_for(self.string(r["cls"]), self.string(r["type"]))
+        return klass(national_no=self.string(r["national_no"]),
+                     name=self.string(r["name"]),
+                     species=self.string(r["species"]),
+                     height_m=float(r["height_m"]),
+                     weight_kg=float(r["weight_kg"]),
+                     abilities=[self.string(j) for j in self._refs[start:start + count]],
+                     stats=Stats(*r["stats"].tolist()))
+
+    def text_fields(self, i):
+        """Return (name, species, abilities) of record i without decoding the rest."""
+        r = self.records[i]
+        start, count = int(r["ab_start"]), int(r["ab_count"])
+        return (self.string(r["name"]), self.string(r["species"]),
+                [self.string(j) for j in self._refs[start:start + count]])
+
+    def lookup(self, column, text, fold=False):
+        """Return the (ascending) record numbers whose column equals text (for
+        "abilities": that have it). With fold=True the comparison is case-insensitive."""
+        if fold:
+            if self._folded is None:
+                self._folded = {}
+                for i in range(len(self._offsets) - 1):
+                    self._folded.setdefault(self.string(i).casefold(), []).append(i)
+            ids = self._folded.get(text.casefold(), [])
+        else:
+            if self._ids is None:
+                self._ids = {self.string(i): i for i in range(len(self._offsets) - 1)}
+            ids = [self._ids[text]] if text in self._ids else []
+        if not ids:
+            return np.zeros(0, dtype=np.intp)
+        if column == "abilities":
+            owners = np.repeat(np.arange(len(self.records)), self.records["ab_count"])
+            return np.unique(owners[np.isin(self._refs, ids)])
+        return np.flatnonzero(np.isin(self.records[column], ids))
+
+    def close(self):
+        """Release the memory map (drop the array views first)."""
+        self.records = self._refs = self._offsets = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+
+
+class LazyEntries(Sequence):
+    """Sequence proxy over a Snapshot that decodes records on access.
+    Decoded Pokémon are kept in a bounded LRU cache. Their stats are read-only:
+    an edit could be lost on eviction, so changes go through the Pokédex, which
+    leaves lazy mode first."""
+
+    def __init__(self, snapshot, cache_size=1024):
+        self.snapshot = snapshot
+        self.cache_size = max(1, int(cache_size))
+        self._cache = OrderedDict()     # record number -> Pokémon
+
+    def __len__(self):
+        return len(self.snapshot)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("Pokédex index out of range")
+        p = self._cache.get(i)
+        if p is None:
+            p = self.snapshot.record(i)
+            p.get_stats()._freeze()
+            self._cache[i] = p
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(i)
+        return p
+
+    def cached(self, i):
+        """Return record i if it is already decoded, else None (no LRU update)."""
+        return self._cache.get(i)
+
+
+# -----------------------
+# Text search
+# -----------------------
+
+def _edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or None if it is greater than limit.
+    Bit-parallel (Myers/Hyyrö): one pass over b with the columns of a packed in an int."""
+    if abs(len(a) - len(b)) > limit:
+        return None
+    if not a:
+        return len(b)
+    peq = {}
+    for i, c in enumerate(a):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    mask = (1 << len(a)) - 1
+    high = 1 << (len(a) - 1)
+    pv, mv, score = mask, 0, len(a)
+    for c in b:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+        ph = (ph << 1) | 1
+        pv = ((mh << 1) | ~(xv | ph)) & mask
+        mv = ph & xv
+    return score if score <= limit else None
+
+
+class TextIndex:
+    """Prefix and typo-tolerant lookup over the texts of one field (e.g. names).
+
+    Texts are compared casefolded. A sorted list of distinct terms answers
+    prefixes with bisect. Fuzzy lookups only verify the edit distance of terms
+    sharing a trigram with the query: k edits change at most 3k trigrams, so a
+    match contains one of any 3k + 1 distinct query trigrams (the rarest are
+    used) and at least all but 3k of them. Queries too short for that fall back
+    to terms of similar length."""
+
+    def __init__(self, items=()):
+        """Build the index from (text, handle) pairs in one pass."""
+        self.postings = {}      # term -> {handle: None}, in insertion order
+        self.display = {}       # term -> text as first added
+        self.grams = {}         # trigram -> set of terms
+        self.by_length = {}     # term length -> set of terms
+        for text, handle in items:
+            self._add(text, handle)
+        self.terms = sorted(self.postings)      # sorted distinct terms
+
+    @staticmethod
+    def _grams(term):
+        padded = f"\0\0{term}\0\0"
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    def _add(self, text, handle):
+        """Add a posting; return the term if it is new to the index."""
+        term = text.casefold()
+        bucket = self.postings.get(term)
+        added = None
+        if bucket is None:
+            bucket = self.postings[term] = {}
+            self.display[term] = text
+            for gram in TextIndex._grams(term):
+                self.grams.setdefault(gram, set()).add(term)
+            self.by_length.setdefault(len(term), set()).add(term)
+            added = term
+        bucket[handle] = None
+        return added
+
+    def add(self, text, handle):
+        term = self._add(text, handle)
+        if term is not None:
+            bisect.insort(self.terms, term)
+
+    def discard(self, text, handle):
+        term = text.casefold()
+        bucket = self.postings.get(term)
+        if bucket is None:
+            return
+        bucket.pop(handle, None)
+        if bucket:
+            return
+        del self.postings[term], self.display[term]
+        del self.terms[bisect.bisect_left(self.terms, term)]
+        for gram in TextIndex._grams(term):
+            self.grams[gram].discard(term)
+            if not self.grams[gram]:
+                del self.grams[gram]
+        self.by_length[len(term)].discard(term)
+
+    def prefix(self, text, limit=None):
+        """Return the terms starting with text, alphabetically."""
+        text = text.casefold()
+        found = []
+        for i in range(bisect.bisect_left(self.terms, text), len(self.terms)):
+            term = self.terms[i]
+            if not term.startswith(text) or len(found) == limit:
+                break
+            found.append(term)
+        return found
+
+    def fuzzy(self, text, max_distance=2):
+        """Return {term: edit distance} for terms within max_distance edits of text."""
+        text = text.casefold()
+        grams = TextIndex._grams(text)
+        if len(grams) > 3 * max_distance:
+            postings = sorted((self.grams.get(g, set()) for g in grams), key=len)
+            rarest, rest = postings[:3 * max_distance + 1], postings[3 * max_distance + 1:]
+            # a match shares at least len(grams) - 3k trigrams with the query
+            needed = len(grams) - 3 * max_distance
+            candidates = Counter()
+            for terms in rarest:
+                candidates.update(terms)
+            candidates = [t for t, n in candidates.items()
+                          if abs(len(t) - len(text)) <= max_distance
+                          and n + sum(1 for terms in rest if t in terms) >= needed]
+        else:
+            candidates = set().union(*(self.by_length.get(n, ()) for n in
+                                       range(len(text) - max_distance, len(text) + max_distance + 1)))
+        found = {}
+        for term in candidates:
+            d = _edit_distance(text, term, max_distance)
+            if d is not None:
+                found[term] = d
+        return found
+
+
 # -----------------------
 # Pokedex
 # -----------------------
 
+@Metrics.watch
 class Pokedex:
     """Singleton class that manages all Pokémon entries."""
 
@@ -418,10 +1320,32 @@ class Pokedex:
         """Private constructor — only one instance allowed."""
         if Pokedex.__instance is not None:
             raise Exception("Pokedex is a Singleton class! Use get_instance().")
-        self.entries = []
+        self._store = {}        # handle -> Pokémon, in insertion order
+        self._handles = {}      # id(Pokémon) -> handle
+        self._next_handle = 0
+        self._by_name = {}      # casefolded name -> {handle: Pokémon}
+        self._by_no = {}        # national number -> {handle: Pokémon}
+        self._by_type = {}      # lowercase type name -> {handle: Pokémon}
+        self._by_species = {}   # casefolded species -> {handle: Pokémon}
+        self._by_ability = {}   # casefolded ability -> {handle: Pokémon}
+        self._stats = StatsStore()
+        self._aggregates = {}   # (type, percentiles) -> (store version, summary)
+        self._lazy = None       # LazyEntries while a snapshot is opened lazily
+        self._text = None       # field -> TextIndex, built on first text search
         self.text_path = ""
         self.json_path = ""
+        self.snapshot_path = ""
         self.dirty = False
+        self.write_behind = False
+        self.max_pending = 100      # flush after this many coalesced changes ...
+        self.max_delay = 5.0        # ... or once the oldest one is this many seconds old
+        self._pending = 0
+        self._pending_since = 0.0
+        self.journal = False
+        self.compact_every = 1000   # fold the journal into the base file after this many ops
+        self._journal_ops = 0
+        self._journal_base = None   # handle layout of the base file, for the journal header
+        self._replaying = False
         Pokedex.__instance = self
 
     @classmethod
@@ -431,81 +1355,867 @@ class Pokedex:
             cls.__instance = Pokedex()
         return cls.__instance
 
+    # Instrumentation
+    @staticmethod
+    def metrics(reset=False):
+        """Return per-operation metrics (empty unless Metrics.enable() was called)."""
+        data = Metrics.snapshot()
+        if reset:
+            Metrics.reset()
+        return data
+
+    # Entries and indexes
+    @property
+    def entries(self):
+        return self.get_entries()
+
+    @entries.setter
+    def entries(self, pokemons):
+        """Replace all entries and rebuild the lookup indexes."""
+        if self._lazy is not None:
+            self._lazy.snapshot.close()
+            self._lazy = None
+        pokemons = list(pokemons)
+        Pokedex._check_new(pokemons, {})
+        for p in self._store.values():
+            p.get_stats()._unbind()
+        self._store, self._handles = {}, {}
+        self._next_handle = 0   # a load numbers its entries 0..n-1, as replay expects
+        self._stats = StatsStore()
+        self._aggregates = {}
+        self._pending = 0
+        self._text = None
+        self._by_name, self._by_no, self._by_type = {}, {}, {}
+        self._by_species, self._by_ability = {}, {}
+        self._insert_many(pokemons)
+
+    @staticmethod
+    def _type_key(p):
+        return p.TYPE_KEY
+
+    def _index_keys(self, p):
+        """Return the (index, key) pairs a Pokémon is filed under."""
+        keys = [(self._by_name, p.get_name().casefold()),
+                (self._by_no, p.get_national_no()),
+                (self._by_type, self._type_key(p)),
+                (self._by_species, p.get_species().casefold())]
+        keys += [(self._by_ability, a.casefold()) for a in p.get_abilities()]
+        return keys
+
+    @staticmethod
+    def _file(index, key, h, p):
+        """Add a posting, keeping every bucket in handle (i.e. insertion) order."""
+        bucket = index.get(key)
+        if bucket is None:
+            index[key] = {h: p}
+        elif h > next(reversed(bucket)):
+            bucket[h] = p
+        else:       # an edited entry joining a bucket of later ones
+            bucket[h] = p
+            index[key] = dict(sorted(bucket.items()))
+
+    @staticmethod
+    def _unfile(index, key, h):
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(h, None)
+            if not bucket:
+                del index[key]
+
+    def _index(self, h, p, keys=None, texts=None):
+        for index, key in self._index_keys(p) if keys is None else keys:
+            Pokedex._file(index, key, h, p)
+        if self._text is not None:
+            for field, text in Pokedex._text_pairs(p) if texts is None else texts:
+                self._text[field].add(text, h)
+
+    def _unindex(self, h, p, keys=None, texts=None):
+        for index, key in self._index_keys(p) if keys is None else keys:
+            Pokedex._unfile(index, key, h)
+        if self._text is not None:
+            for field, text in Pokedex._text_pairs(p) if texts is None else texts:
+                self._text[field].discard(text, h)
+
+    @staticmethod
+    def _check_new(pokemons, handles):
+        """Raise ValueError if a Pokémon object is given twice or is already stored
+        (handles map objects by identity, so each entry must be its own object)."""
+        seen = set()
+        for p in pokemons:
+            if id(p) in handles or id(p) in seen:
+                raise ValueError(f"{p.get_name()} is already in the Pokédex; add a copy instead.")
+            seen.add(id(p))
+
+    def _insert(self, p):
+        Pokedex._check_new((p,), self._handles)
+        h = self._next_handle
+        self._stats.attach(p.get_stats(), self._type_key(p), h)     # may refuse shared Stats
+        self._next_handle += 1
+        self._store[h] = p
+        self._handles[id(p)] = h
+        self._index(h, p)
+        return h
+
+    def _insert_many(self, pokemons, handles=None):
+        """Insert many Pokémon with a single stats-store update; returns them as a list.
+        handles (ascending, above any in use) are numbered from the next free one by default."""
+        pokemons = list(pokemons)
+        if not pokemons:
+            return pokemons
+        Pokedex._check_new(pokemons, self._handles)
+        if handles is None:
+            handles = range(self._next_handle, self._next_handle + len(pokemons))
+        self._stats.attach_many([p.get_stats() for p in pokemons],     # may refuse shared Stats
+                                [self._type_key(p) for p in pokemons],
+                                handles)
+        self._next_handle = handles[-1] + 1
+        self._text = None       # rebuilt on the next text search
+        for h, p in zip(handles, pokemons):
+            self._store[h] = p
+            self._handles[id(p)] = h
+            self._index(h, p)
+        return pokemons
+
+    def _delete(self, p):
+        h = self._handles.pop(id(p))
+        del self._store[h]
+        self._unindex(h, p)
+        self._stats.release(p.get_stats())
+
+    def _materialize(self):
+        """Leave lazy mode by decoding every snapshot record into regular entries.
+        Records already in the LRU cache keep their identity."""
+        if self._lazy is None:
+            return
+        lazy, self._lazy = self._lazy, None
+        loaded = [lazy.cached(i) or lazy.snapshot.record(i) for i in range(len(lazy))]
+        lazy.snapshot.close()
+        self.entries = loaded
+
+    def is_lazy(self):
+        """Return True while entries are served lazily from a snapshot."""
+        return self._lazy is not None
+
+    def get_handle(self, p):
+        """Return the stable handle of a Pokémon stored in the Pokédex."""
+        self._materialize()
+        try:
+            return self._handles[id(p)]
+        except KeyError:
+            raise PokemonNotFoundError(f"{p.get_name()} is not in the Pokédex.") from None
+
+    def get_by_handle(self, h):
+        """Return the Pokémon stored under a handle."""
+        self._materialize()
+        try:
+            return self._store[h]
+        except KeyError:
+            raise PokemonNotFoundError(f"No Pokémon found with handle: {h}") from None
+
     # Core operations
+    @instrumented
     def add(self, p):
-        """Add a Pokémon object to the Pokédex."""
-        self.entries.append(p)
-        self.dirty = True
+        """Add a Pokémon object to the Pokédex (ValueError if that object is already in it)."""
+        self._materialize()
+        self._insert(p)
+        self._changed({"op": "add", "pokemon": p.to_dict()})
+
+    @instrumented
+    def add_many(self, pokemons):
+        """Add many Pokémon objects with one stats-store and aggregate update,
+        recorded as a single change. Returns the number added."""
+        self._materialize()
+        pokemons = self._insert_many(pokemons)
+        if pokemons:
+            # only serialize the entries when a journal needs them
+            self._changed({"op": "add_many",
+                           "pokemons": [p.to_dict() for p in pokemons] if self.journal else []})
+        return len(pokemons)
 
     def get_entries(self):
-        """Return all Pokémon entries."""
-        return self.entries
+        """Return all Pokémon entries in insertion order
+        (a lazily decoding sequence in lazy snapshot mode)."""
+        if self._lazy is not None:
+            return self._lazy
+        return list(self._store.values())
 
     def count(self):
         """Return the number of Pokémon currently in the Pokédex."""
-        return len(self.entries)
+        if self._lazy is not None:
+            return len(self._lazy)
+        return len(self._store)
 
     # Search operations
+    def _lazy_find(self, column, text):
+        return [self._lazy[int(i)] for i in self._lazy.snapshot.lookup(column, text, fold=True)]
+
+    @instrumented
     def find_by_name(self, name):
-        for p in self.entries:
-            if p.get_name().lower() == name.lower():
-                return p
+        if self._lazy is not None:
+            found = self._lazy_find("name", str(name))
+            if found:
+                return found[0]
+            raise PokemonNotFoundError(f"No Pokémon found with name: {name}")
+        bucket = self._by_name.get(str(name).casefold())
+        if bucket:
+            return next(iter(bucket.values()))
         raise PokemonNotFoundError(f"No Pokémon found with name: {name}")
 
+    @instrumented
     def find_by_national_no(self, no):
-        no_str = str(no)
-        for p in self.entries:
-            if p.get_national_no() == no_str:
-                return p
+        if self._lazy is not None:
+            hits = self._lazy.snapshot.lookup("national_no", str(no))
+            if len(hits):
+                return self._lazy[int(hits[0])]
+            raise PokemonNotFoundError(f"No Pokémon found with national number: {no}")
+        bucket = self._by_no.get(str(no))
+        if bucket:
+            return next(iter(bucket.values()))
         raise PokemonNotFoundError(f"No Pokémon found with national number: {no}")
 
+    @instrumented
     def find_by_type(self, type_name):
-        wanted = str(type_name).lower()
-        results = [p for p in self.entries
-                   if getattr(p.__class__, "TYPE_NAME", "").lower() == wanted]
-        return results
+        if self._lazy is not None:
+            return self._lazy_find("type", str(type_name))
+        return list(self._by_type.get(str(type_name).lower(), {}).values())
+
+    @instrumented
+    def find_by_ability(self, *abilities, match="all"):
+        """Return Pokémon having all (match="all") or any (match="any") of the
+        abilities, case-insensitive, in insertion order."""
+        return self._find_postings("abilities", self._by_ability, abilities, match)
+
+    @instrumented
+    def find_by_species(self, *species, match="any"):
+        """Return Pokémon of any of the species (case-insensitive), in insertion order."""
+        return self._find_postings("species", self._by_species, species, match)
+
+    def _find_postings(self, column, index, keys, match):
+        """Intersect (match="all") or unite (match="any") the posting sets of keys."""
+        if match not in ("all", "any"):
+            raise ValueError("match must be 'all' or 'any'.")
+        if not keys:
+            return []
+        if self._lazy is not None:
+            hits = [self._lazy.snapshot.lookup(column, str(k), fold=True) for k in keys]
+            combine = np.intersect1d if match == "all" else np.union1d
+            return [self._lazy[int(i)] for i in functools.reduce(combine, hits)]
+        postings = [index.get(str(k).casefold(), {}) for k in keys]
+        if match == "all":
+            postings.sort(key=len)      # intersect starting from the rarest key
+            handles = set(postings[0])
+            for bucket in postings[1:]:
+                handles &= bucket.keys()
+        else:
+            handles = set().union(*postings)
+        return [self._store[h] for h in sorted(handles)]
+
+    # Text search (prefix and fuzzy)
+    TEXT_FIELDS = ("name", "species", "abilities")
+
+    @staticmethod
+    def _text_fields(p):
+        return (("name", (p.get_name(),)), ("species", (p.get_species(),)),
+                ("abilities", p.get_abilities()))
+
+    @staticmethod
+    def _text_pairs(p):
+        return [(field, text) for field, texts in Pokedex._text_fields(p) for text in texts]
+
+    def _text_index(self):
+        """Return the per-field text indexes, building them on first use. In lazy
+        mode they are keyed by record number and built without decoding records."""
+        if self._text is None:
+            items = {field: [] for field in Pokedex.TEXT_FIELDS}
+            if self._lazy is not None:
+                snap = self._lazy.snapshot
+                for i in range(len(snap)):
+                    name, species, abilities = snap.text_fields(i)
+                    items["name"].append((name, i))
+                    items["species"].append((species, i))
+                    items["abilities"].extend((a, i) for a in abilities)
+            else:
+                for h, p in self._store.items():
+                    for field, texts in Pokedex._text_fields(p):
+                        items[field].extend((text, h) for text in texts)
+            self._text = {field: TextIndex(pairs) for field, pairs in items.items()}
+        return self._text
+
+    def _resolve(self, h):
+        return self._lazy[h] if self._lazy is not None else self._store[h]
+
+    @instrumented
+    def complete(self, prefix, field="name", limit=10):
+        """Return up to limit names (or species/abilities) starting with prefix,
+        case-insensitive, in alphabetical order."""
+        if field not in Pokedex.TEXT_FIELDS:
+            raise ValueError(f"Unknown text field '{field}'.")
+        index = self._text_index()[field]
+        return [index.display[term] for term in index.prefix(str(prefix), limit)]
+
+    @instrumented
+    def search(self, text, max_distance=2, fields=TEXT_FIELDS, limit=None):
+        """Return Pokémon whose name, species or an ability is within max_distance
+        edits of text (case-insensitive), closest first, then in insertion order.
+        Short text allows fewer edits: none up to 2 characters, one up to 5."""
+        text = str(text)
+        max_distance = min(max_distance, 0 if len(text) <= 2 else 1 if len(text) <= 5 else 2)
+        best = {}
+        for field in fields:
+            if field not in Pokedex.TEXT_FIELDS:
+                raise ValueError(f"Unknown text field '{field}'.")
+            index = self._text_index()[field]
+            for term, d in index.fuzzy(text, max_distance).items():
+                for h in index.postings[term]:
+                    if d < best.get(h, max_distance + 1):
+                        best[h] = d
+        ranked = sorted(best, key=lambda h: (best[h], h))
+        return [self._resolve(h) for h in ranked[:limit]]
+
+    # Aggregates (vectorized over the stats store)
+    @instrumented
+    def stat_summary(self, type_name=None, percentiles=(25, 50, 75)):
+        """Return count, sum, mean, min, max and percentiles per stat and total.
+        Covers one type when type_name is given, otherwise the whole Pokédex.
+        Results are cached until the next change to the stats store."""
+        key = None if type_name is None else str(type_name).lower()
+        cache_key = (key, tuple(percentiles or ()))
+        cached = self._aggregates.get(cache_key)
+        if cached is not None and cached[0] == self._stats.version:
+            return copy.deepcopy(cached[1])
+        if self._lazy is not None:
+            summary = StatsStore.summarize(self._lazy_stats_rows(key), percentiles)
+        else:
+            summary = self._stats.summary(key, percentiles)
+        self._aggregates[cache_key] = (self._stats.version, summary)
+        return copy.deepcopy(summary)
+
+    def _lazy_stats_rows(self, type_key):
+        snap = self._lazy.snapshot
+        rows = snap.records["stats"].astype(np.int64)
+        if type_key is None:
+            return rows
+        return rows[snap.lookup("type", type_key, fold=True)]
+
+    @instrumented
+    def type_moments(self, type_name=None):
+        """Return count plus mean, variance and standard deviation of each stat for a
+        type (or all types), from running sums kept up to date on every change."""
+        key = None if type_name is None else str(type_name).lower()
+        if self._lazy is not None:
+            rows = self._lazy_stats_rows(key)
+            return StatsStore.describe(len(rows), rows.sum(axis=0).tolist(),
+                                       (rows * rows).sum(axis=0).tolist())
+        return StatsStore.describe(*self._stats.moments(key))
+
+    def calculate_average(self, type_name):
+        """Average stats of any registered type (same shape as the class-level
+        calculate_average), or None if the type has no Pokémon."""
+        return self.average_stats(type_name)
+
+    @instrumented
+    def average_stats(self, type_name):
+        """Return average stats (rounded to 1 dp) for a type, or None if it has no Pokémon."""
+        moments = self.type_moments(type_name)
+        if moments is None:
+            return None
+        return {k: round(moments["mean"][k], 1) for k in Stats.FIELDS}
+
+    # Sorted stat indexes
+    @staticmethod
+    def _stat_column(field):
+        if field == "total":
+            return StatsStore.TOTAL
+        column = Stats._INDEX.get(field)
+        if column is None:
+            raise ValueError(f"Unknown stat '{field}'.")
+        return column
+
+    @instrumented
+    def range_by_stat(self, field, low=None, high=None):
+        """Return Pokémon whose stat (or "total") is between low and high inclusive,
+        in ascending order of that value. Uses a sorted index: O(log n + k)."""
+        column = Pokedex._stat_column(field)
+        if self._lazy is not None:
+            bounds = {f"{field}__gte": low, f"{field}__lte": high}
+            return self.query(order_by=field, **{k: v for k, v in bounds.items() if v is not None})
+        return [self._store[h] for h in self._stats.owners_in_range(column, low, high)]
+
+    @instrumented
+    def top_by_stat(self, field, k=10):
+        """Return the k Pokémon with the highest stat (or "total"), highest first."""
+        column = Pokedex._stat_column(field)
+        if self._lazy is not None:
+            return self.query(order_by="-" + field, limit=k)
+        return [self._store[h] for h in self._stats.top_owners(column, k)]
+
+    # Queries (vectorized over the stats store)
+    _QUERY_OPS = {"eq": operator.eq, "ne": operator.ne, "gt": operator.gt, "gte": operator.ge,
+                  "lt": operator.lt, "lte": operator.le, "in": np.isin}
+    _QUERY_FIELDS = {**{k: k for k in Stats.FIELDS}, "total": "total",
+                     "height_m": "height_m", "height": "height_m",
+                     "weight_kg": "weight_kg", "weight": "weight_kg"}
+    _ORDER_FIELDS = {**_QUERY_FIELDS, "name": "name", "national_no": "national_no"}
+    _QUERY_GETTERS = {"height_m": BasePokemon.get_height, "weight_kg": BasePokemon.get_weight,
+                      "name": BasePokemon.get_name, "national_no": BasePokemon.get_national_no}
+
+    @instrumented
+    def query(self, type=None, name=None, national_no=None, species=None, ability=None,
+              order_by=None, limit=None, **filters):
+        """Return the Pokémon matching all the given criteria, e.g.
+        dex.query(type="Fire", speed__gt=100, weight__lt=10, order_by="-total", limit=20)
+
+        Filters are field__op=value, where field is a stat, total, height (height_m)
+        or weight (weight_kg), and op is eq (the default), ne, gt, gte, lt, lte or in.
+        type, name, national_no, species and ability are exact matches answered
+        from the indexes.
+        order_by accepts the same fields plus name and national_no ('-' prefix for
+        descending); ties, and results without order_by, keep insertion order.
+        With a limit only the top results are selected (heap), not a full sort."""
+        predicates = []
+        for key, value in filters.items():
+            field, _, op = key.partition("__")
+            column = Pokedex._QUERY_FIELDS.get(field)
+            compare = Pokedex._QUERY_OPS.get(op or "eq")
+            if column is None or compare is None:
+                raise ValueError(f"Unsupported query filter '{key}'.")
+            if compare is np.isin:
+                value = list(value)
+            predicates.append((column, compare, value))
+
+        descending, order_field = False, None
+        if order_by is not None:
+            descending = order_by.startswith("-")
+            order_field = Pokedex._ORDER_FIELDS.get(order_by.lstrip("-"))
+            if order_field is None:
+                raise ValueError(f"Unsupported order_by field '{order_by}'.")
+        if limit is not None and limit <= 0:
+            return []
+
+        type_key = None if type is None else str(type).lower()
+        exact = {k: str(v) for k, v in (("name", name), ("national_no", national_no),
+                                        ("species", species), ("abilities", ability))
+                 if v is not None}
+        if self._lazy is not None:
+            ids, column, resolve = self._lazy_query_source(type_key, exact)
+        else:
+            ids, column, resolve = self._query_source(type_key, exact)
+
+        for field, compare, value in predicates:
+            if not len(ids):
+                break
+            ids = ids[compare(column(field, ids), value)]
+
+        ids = ids.tolist()
+        if order_field is not None and ids:
+            keys = column(order_field, np.array(ids))
+            keys = keys.tolist() if isinstance(keys, np.ndarray) else keys
+            positions = range(len(ids))
+            if limit is None:
+                positions = sorted(positions, key=keys.__getitem__, reverse=descending)
+            elif descending:
+                positions = heapq.nlargest(limit, positions, key=lambda j: (keys[j], -j))
+            else:
+                positions = heapq.nsmallest(limit, positions, key=lambda j: (keys[j], j))
+            ids = [ids[j] for j in positions]
+        return [resolve(i) for i in ids[:limit]]
+
+    def _query_source(self, type_key, exact):
+        """Candidate store rows (in insertion order) plus column and row -> Pokémon accessors.
+        exact maps name/national_no/species/abilities to the text to match."""
+        store = self._stats
+        mask = store.mask(type_key)
+        if not exact:
+            rows = np.flatnonzero(mask)
+        else:
+            indexes = {"name": self._by_name, "national_no": self._by_no,
+                       "species": self._by_species, "abilities": self._by_ability}
+            hits = None
+            for field, text in exact.items():
+                bucket = indexes[field].get(text if field == "national_no" else text.casefold(), {})
+                hits = bucket.keys() if hits is None else hits & bucket.keys()
+            rows = np.array([self._store[h].get_stats()._location()[1] for h in hits], dtype=np.intp)
+            rows = rows[mask[rows]]
+        rows = rows[np.argsort(store.owners[rows], kind="stable")]
+
+        def resolve(row):
+            return self._store[int(store.owners[row])]
+
+        def column(field, rows):
+            i = Stats._INDEX.get(field)
+            if i is not None:
+                return store.data[rows, i]
+            if field == "total":
+                return store.data[rows].sum(axis=1)
+            getter = Pokedex._QUERY_GETTERS[field]
+            values = [getter(resolve(r)) for r in rows.tolist()]
+            return values if field in ("name", "national_no") else np.array(values, dtype=float)
+
+        return rows, column, resolve
+
+    def _lazy_query_source(self, type_key, exact):
+        """Like _query_source, but over the snapshot records; only results are decoded."""
+        snap = self._lazy.snapshot
+        ids = np.arange(len(self._lazy))
+        if type_key is not None:
+            ids = np.intersect1d(ids, snap.lookup("type", type_key, fold=True))
+        for column, text in exact.items():
+            ids = np.intersect1d(ids, snap.lookup(column, text, fold=column != "national_no"))
+
+        def column(field, ids):
+            records = snap.records[ids]
+            i = Stats._INDEX.get(field)
+            if i is not None:
+                return records["stats"][:, i].astype(np.int64)
+            if field == "total":
+                return records["stats"].astype(np.int64).sum(axis=1)
+            if field in ("name", "national_no"):
+                return [snap.string(int(s)) for s in records[field]]
+            return records[field]
+
+        return ids, column, lambda i: self._lazy[int(i)]
 
     # Remove operations
+    @instrumented
     def remove_by_name(self, name):
+        self._materialize()
         try:
-            p = self.find_by_name(name)
-            self.entries.remove(p)
-            self.dirty = True
+            self._remove(self.find_by_name(name))
             return True
         except PokemonNotFoundError:
             return False
 
+    @instrumented
     def remove_by_national_no(self, no):
+        self._materialize()
         try:
-            p = self.find_by_national_no(no)
-            self.entries.remove(p)
-            self.dirty = True
+            self._remove(self.find_by_national_no(no))
             return True
         except PokemonNotFoundError:
             return False
 
     # Update operations
+    @instrumented
     def update_by_name(self, name, field, value):
+        self._materialize()
         try:
-            p = self.find_by_name(name)
-            p.get_stats().set_stat(field, value)
-            self.dirty = True
+            self._update_stat(self.find_by_name(name), field, value)
             return True
         except (PokemonNotFoundError, Exception):
             return False
 
+    @instrumented
     def update_by_national_no(self, no, field, value):
+        self._materialize()
         try:
-            p = self.find_by_national_no(no)
-            p.get_stats().set_stat(field, value)
-            self.dirty = True
+            self._update_stat(self.find_by_national_no(no), field, value)
             return True
         except (PokemonNotFoundError, Exception):
             return False
 
+    def _remove(self, p):
+        h = self._handles[id(p)]
+        self._delete(p)
+        self._changed({"op": "remove", "h": h})
+
+    def _update_stat(self, p, field, value):
+        p.get_stats().set_stat(field, value)
+        self._changed({"op": "update_stat", "h": self._handles[id(p)],
+                       "field": field, "value": int(value)})
+
+    @instrumented
+    def set_basic_info(self, p, name, national_no, species, height_m, weight_kg, abilities):
+        """Update a Pokémon's basic info and keep the lookup indexes in sync."""
+        h = self.get_handle(p)      # also leaves lazy mode
+        old_keys, old_texts = self._index_keys(p), Pokedex._text_pairs(p)
+        try:
+            p.set_basic_info(name, national_no, species, height_m, weight_kg, abilities)
+        finally:
+            # refile only the keys that changed, so the other buckets keep their order
+            keys, texts = self._index_keys(p), Pokedex._text_pairs(p)
+            same = {(id(index), key) for index, key in old_keys} & {(id(index), key) for index, key in keys}
+            self._unindex(h, p, [(i, k) for i, k in old_keys if (id(i), k) not in same],
+                          [t for t in old_texts if t not in texts])
+            self._index(h, p, [(i, k) for i, k in keys if (id(i), k) not in same],
+                        [t for t in texts if t not in old_texts])
+        self._changed({"op": "set_basic_info", "h": h,
+                       "info": [name, str(national_no), species, float(height_m),
+                                float(weight_kg), list(abilities)]})
+
+    # Write-behind
+    def enable_write_behind(self, max_pending=100, max_delay=5.0):
+        """Coalesce changes and write the loaded file only every max_pending changes,
+        once the oldest unsaved change is max_delay seconds old, or at exit."""
+        self.max_pending = max_pending
+        self.max_delay = max_delay
+        if not self.write_behind:
+            self.write_behind = True
+            atexit.register(self.flush)
+
+    def disable_write_behind(self):
+        """Flush pending changes and go back to writing only on request."""
+        if self.write_behind:
+            self.write_behind = False
+            atexit.unregister(self.flush)
+            self.flush()
+
+    def _changed(self, op):
+        """Record one change; journal it and, in write-behind mode, flush when due."""
+        self.dirty = True
+        if self._replaying:
+            return
+        if self._pending == 0:
+            self._pending_since = time.monotonic()
+        self._pending += 1
+        if self.journal:
+            self._append_journal(op)    # may write the base file, clearing the pending state
+        if self.write_behind:
+            self.flush_if_due()
+        elif self.journal and self._journal_ops >= self.compact_every:
+            self.compact()
+
+    def flush_if_due(self):
+        """Flush if the pending-change count or age threshold has been reached."""
+        if not (self.write_behind and self.dirty):
+            return None
+        if (self._pending >= self.max_pending or
+                time.monotonic() - self._pending_since >= self.max_delay):
+            try:
+                return self.flush()
+            except Exception as e:
+                print("Write-behind flush failed:", e)
+        return None
+
+    def _base_path(self):
+        """Return the file the Pokédex writes back to (same precedence as flush)."""
+        return self.json_path or self.text_path or self.snapshot_path
+
+    def flush(self, force=False):
+        """Write the Pokédex back to the file it was loaded from if there are unsaved
+        changes (always, with force=True). Returns the path written, or None."""
+        if not (self.dirty or force):
+            return None
+        if self.json_path:
+            path = self.save_json(self.json_path)
+        elif self.text_path:
+            self.save(self.text_path)
+            path = self.text_path
+        elif self.snapshot_path:
+            path = self.save_snapshot(self.snapshot_path)
+        else:
+            return None
+        self.dirty = False
+        self._pending = 0
+        return path
+
+    # Change journal
+    @staticmethod
+    def journal_path(base_path):
+        return base_path + ".journal"
+
+    @staticmethod
+    def _fingerprint(path):
+        """Identify one version of a base file; atomic saves always change it."""
+        st = os.stat(path)
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+    def enable_journal(self, compact_every=1000):
+        """Append every change to '<base file>.journal' instead of rewriting the base
+        file; the journal is folded back into the base every compact_every changes."""
+        self.compact_every = compact_every
+        self.journal = True
+
+    def disable_journal(self):
+        """Fold any journaled changes into the base file and stop journaling."""
+        if self.journal:
+            if self.dirty:
+                self.compact()
+            self.journal = False
+
+    def _append_journal(self, op):
+        base = self._base_path()
+        if not base:
+            return
+        if not os.path.exists(base):
+            self.flush(force=True)      # the journal needs a base file to apply to
+            return
+        path = Pokedex.journal_path(base)
+        with open(path, "a", encoding="utf-8") as f:
+            if f.tell() == 0:
+                header = dict(self._journal_base or self._handle_layout(),
+                              base=Pokedex._fingerprint(base))
+                f.write(json.dumps(header) + "\n")
+            f.write(json.dumps(op) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_ops += 1
+
+    def _handle_layout(self):
+        """Return the handles of the entries, in order, as [start, length] runs, and
+        the next free handle. Journaled changes name their target by handle (names
+        and numbers can repeat); replay restores this layout onto the loaded base."""
+        if self._lazy is not None:      # leaving lazy mode numbers the records 0..n-1
+            n = len(self._lazy)
+            return {"handles": [[0, n]] if n else [], "next": n}
+        runs = []
+        if self._store and next(reversed(self._store)) - next(iter(self._store)) + 1 != len(self._store):
+            for h in self._store:
+                if runs and runs[-1][0] + runs[-1][1] == h:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([h, 1])
+        elif self._store:
+            runs = [[next(iter(self._store)), len(self._store)]]
+        return {"handles": runs, "next": self._next_handle}
+
+    def _drop_journal(self, base_path):
+        """Delete the journal of a base file that now holds the full state."""
+        path = Pokedex.journal_path(base_path)
+        if os.path.exists(path):
+            os.remove(path)
+        self._journal_ops = 0
+        self._journal_base = self._handle_layout()
+
+    def _replay_journal(self, base_path):
+        """Re-apply journaled changes made since base_path was last written."""
+        path = Pokedex.journal_path(base_path)
+        self._journal_base = self._handle_layout()      # the state just loaded
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        if header.get("base") != Pokedex._fingerprint(base_path) or "next" not in header:
+            # the base was rewritten after these changes (e.g. a crash mid-compaction)
+            os.remove(path)
+            return 0
+
+        # give the entries the handles they had when the base was written, so the
+        # journal's handles (and those of replayed adds) name the same entries
+        self._materialize()
+        handles = [h for start, n in header["handles"] for h in range(start, start + n)]
+        if handles != list(self._store):
+            pokemons = self.get_entries()
+            self.entries = []
+            self._insert_many(pokemons, handles)
+        self._next_handle = header["next"]
+        self._journal_base = {"handles": header["handles"], "next": header["next"]}
+        self._replaying = True
+        applied = 0
+        try:
+            for line in lines[1:]:
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break       # torn final write
+                self._apply_op(op)
+                applied += 1
+        finally:
+            self._replaying = False
+        self._journal_ops = applied
+        if applied:
+            print(f"Replayed {applied} journaled change(s) from '{path}'")
+        return applied
+
+    def _apply_op(self, op):
+        kind = op.get("op")
+        if kind == "add":
+            self.add(BasePokemon.from_dict(op["pokemon"]))
+        elif kind == "add_many":
+            self.add_many(BasePokemon.from_dict(d) for d in op["pokemons"])
+        elif kind in ("remove", "update_stat", "set_basic_info"):
+            p = self._store.get(op["h"])
+            if p is None:
+                return
+            if kind == "remove":
+                self._remove(p)
+            elif kind == "update_stat":
+                self._update_stat(p, op["field"], op["value"])
+            else:
+                self.set_basic_info(p, *op["info"])
+
+    def compact(self):
+        """Fold the journal into a fresh base file and remove the journal."""
+        return self.flush(force=True)
+
     # File I/O (Text)
-    def load(self, filepath):
-        """Load Pokémon data from a plain text file."""
+    @staticmethod
+    def iter_text(filepath):
+        """Yield one Pokémon per blank-line-separated block of a text file."""
+        with open(filepath, "r", encoding="utf-8") as f:
+            yield from Pokedex._parse_lines(f)
+
+    # line key -> slot in the parser's value list (slot 6 holds the unused Total);
+    # -1 marks the known basic-info keys, which go into the block dict
+    _KEY_SLOTS = {"HP": 0, "Attack": 1, "Defense": 2, "Special Attack": 3,
+                  "Special Defense": 4, "Speed": 5, "Total": 6,
+                  "Name": -1, "National Number": -1, "Type": -1, "Species": -1,
+                  "Height": -1, "Weight": -1, "Abilities": -1}
+
+    @staticmethod
+    def _parse_lines(lines):
+        """Yield one Pokémon per blank-line-separated block of text lines.
+        Single pass: one partition per line and a dict hit to route stat keys."""
+        slots = Pokedex._KEY_SLOTS
+        build = Pokedex._build_pokemon
+        block, values = {}, [0] * 7
+        for line in lines:
+            line = line.strip()
+            if not line:
+                if block:
+                    yield build(block, Stats.from_values(values[:6]))
+                    block, values = {}, [0] * 7
+                continue
+            key, sep, val = line.partition(":")
+            if not sep or key == "Stats":
+                continue
+            i = slots.get(key, -2)
+            if i == -2:
+                key = key.rstrip()
+                i = slots.get(key, -1)
+            if i < 0:
+                block[key] = val.strip()
+            else:
+                try:
+                    values[i] = int(val)
+                except ValueError:
+                    values[i] = int(val.split()[0])
+        if block:
+            yield build(block, Stats.from_values(values[:6]))
+
+    @staticmethod
+    def text_chunks(filepath, n_chunks):
+        """Split a text file into at most n_chunks (start, end) byte ranges that
+        each begin right after a blank line, i.e. on a block boundary."""
+        size = os.path.getsize(filepath)
+        bounds = [0]
+        with open(filepath, "rb") as f:
+            for i in range(1, n_chunks):
+                target = size * i // n_chunks
+                if target <= bounds[-1]:
+                    continue
+                f.seek(target)
+                f.readline()                # finish the line we landed in
+                while True:
+                    line = f.readline()
+                    if not line or not line.strip():
+                        break
+                pos = f.tell()
+                if pos >= size:
+                    break
+                if pos > bounds[-1]:
+                    bounds.append(pos)
+        bounds.append(size)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    @instrumented(io="read")
+    def load(self, filepath, workers=1):
+        """Load Pokémon data from a plain text file.
+        With workers > 1 the file is split on block boundaries and the pieces are
+        parsed in worker processes; the result is the same as a serial load."""
         self.entries = []
         self.text_path = filepath
         if not os.path.exists(filepath):
@@ -513,38 +2223,31 @@ class Pokedex:
             print(f"File '{filepath}' not found. Starting with empty Pokédex.")
             return
 
-        with open(filepath, "r", encoding="utf-8") as f:
-            block, stats = {}, {}
-            for line in f:
-                line = line.strip()
-                if not line:
-                    if block:
-                        self._create_pokemon_from_block(block, stats)
-                        block, stats = {}, {}
-                    continue
-                if line.startswith("Stats:"):
-                    continue
-                if ":" in line:
-                    key, val = line.split(":", 1)
-                    key, val = key.strip(), val.strip()
-                    if key in ["Total", "HP", "Attack", "Defense",
-                               "Special Attack", "Special Defense", "Speed"]:
-                        stats[key] = int(val.split()[0])
-                    else:
-                        block[key] = val
-            if block:
-                self._create_pokemon_from_block(block, stats)
+        if workers is None or workers > 1:
+            workers = workers or os.cpu_count() or 1
+            ranges = [(filepath, start, end)
+                      for start, end in Pokedex.text_chunks(filepath, workers * 4)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for records in pool.map(_parse_text_range, ranges):
+                    for r in records:
+                        self._insert(BasePokemon.from_record(r))
+        else:
+            for p in Pokedex.iter_text(filepath):
+                self._insert(p)
         self.dirty = False
-        print(f"Loaded {len(self.entries)} Pokémon from '{filepath}'")
+        print(f"Loaded {self.count()} Pokémon from '{filepath}'")
+        self._replay_journal(filepath)
 
+    @instrumented(io="write")
     def save(self, filepath=""):
+        self._materialize()
         if filepath:
             self.text_path = filepath
         if not self.text_path:
             raise ValueError("No text file path set for saving.")
 
-        with open(self.text_path, "w", encoding="utf-8") as f:
-            for p in self.entries:
+        with atomic_write(self.text_path) as f:
+            for p in self._store.values():
                 row = p.to_row()
                 f.write("Name: {}\n".format(row["name"]))
                 f.write("National Number: No. {}\n".format(row["national_no"]))
@@ -562,59 +2265,88 @@ class Pokedex:
                 f.write("  Special Defense: {}\n".format(row["sp_def"]))
                 f.write("  Speed: {}\n".format(row["speed"]))
                 f.write("\n")
+        self._drop_journal(self.text_path)
         self.dirty = False
         print(f"Pokédex saved to '{self.text_path}'")
+        return self.text_path
 
-    # Helper to create Pokémon from text block
-    def _create_pokemon_from_block(self, block, stats):
-        s = Stats(
-            stats.get("HP", 0),
-            stats.get("Attack", 0),
-            stats.get("Defense", 0),
-            stats.get("Special Attack", 0),
-            stats.get("Special Defense", 0),
-            stats.get("Speed", 0)
-        )
+    @staticmethod
+    def _leading_float(text):
+        """Parse the number in '0.6 m' / '8.5 kg' (first whitespace-separated token)."""
+        try:
+            return float(text.partition(" ")[0])
+        except ValueError:
+            return float(text.split()[0])
 
+    @staticmethod
+    def _build_pokemon(block, s):
         name = block.get("Name", "Unknown")
         national_no = str(block.get("National Number", "0000")).replace("No. ", "").zfill(4)
         species = block.get("Species", "???")
-        height = float(str(block.get("Height", "0")).split()[0])
-        weight = float(str(block.get("Weight", "0")).split()[0])
+        height = Pokedex._leading_float(str(block.get("Height", "0")))
+        weight = Pokedex._leading_float(str(block.get("Weight", "0")))
         abilities = block.get("Abilities", "").split(";")
 
-        type_name = (block.get("Type", "") or "").strip().lower()
-
-        lname = name.lower()
-        if lname == "charmander":
-            p = Charmander(national_no=national_no, name=name, species=species,
-                        height_m=height, weight_kg=weight,
-                        abilities=abilities, stats=s)
-        elif lname == "vulpix":
-            p = Vulpix(national_no=national_no, name=name, species=species,
-                    height_m=height, weight_kg=weight,
-                    abilities=abilities, stats=s)
-        elif lname == "bulbasaur":
-            p = Bulbasaur(national_no=national_no, name=name, species=species,
-                        height_m=height, weight_kg=weight,
-                        abilities=abilities, stats=s)
-        elif lname == "oddish":
-            p = Oddish(national_no=national_no, name=name, species=species,
-                    height_m=height, weight_kg=weight,
-                    abilities=abilities, stats=s)
-        else:
-            if type_name == "fire":
-                klass = GenericFirePokemon
-            elif type_name == "grass":
-                klass = GenericGrassPokemon
-            else:
-                raise ValueError(f"Unknown Type for '{name}'. Provide 'Type: Fire' or 'Type: Grass'.")
-            p = klass(national_no=national_no, name=name, species=species,
-                    height_m=height, weight_kg=weight,
-                    abilities=abilities, stats=s)
-        self.entries.append(p)
+        klass = TypeRegistry.class_for_name(name, block.get("Type", "") or "")
+        if klass is None:
+            options = " or ".join(f"'Type: {t}'" for t in TypeRegistry.type_names())
+            raise ValueError(f"Unknown Type for '{name}'. Provide {options}.")
+        return klass(national_no=national_no, name=name, species=species,
+                     height_m=height, weight_kg=weight,
+                     abilities=abilities, stats=s)
 
     # File I/O (JSON)
+    @staticmethod
+    def iter_json(filepath, chunk_size=1 << 16):
+        """Yield Pokémon from a JSON array file, decoding one element at a time."""
+        decoder = json.JSONDecoder()
+        with open(filepath, "r", encoding="utf-8") as f:
+            buf, pos, eof = "", 0, False
+            started = False
+            while True:
+                # skip whitespace and separators, refilling the buffer as needed
+                while pos < len(buf) and buf[pos] in " \t\r\n,":
+                    pos += 1
+                if pos == len(buf):
+                    if eof:
+                        raise ValueError(f"Unexpected end of JSON file '{filepath}'.")
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buf, pos = buf[pos:] + chunk, 0
+                    continue
+                if not started:
+                    if buf[pos] != "[":
+                        raise ValueError(f"JSON file '{filepath}' must contain a list.")
+                    started = True
+                    pos += 1
+                    continue
+                if buf[pos] == "]":
+                    return
+                try:
+                    d, end = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    d, end = None, len(buf)
+                if end == len(buf) and not eof:
+                    # element may be cut off at the chunk boundary
+                    chunk = f.read(chunk_size)
+                    eof = not chunk
+                    buf, pos = buf[pos:] + chunk, 0
+                    continue
+                if d is None:
+                    raise ValueError(f"Invalid JSON element in '{filepath}'.")
+                pos = end
+                yield BasePokemon.from_dict(d)
+
+    @staticmethod
+    def iter_jsonl(filepath):
+        """Yield Pokémon from a JSON Lines file (one object per line)."""
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield BasePokemon.from_dict(json.loads(line))
+
+    @instrumented(io="read")
     def load_json(self, filepath="pokemon.json"):
         """Load Pokémon data from a JSON file into the Pokédex."""
         if not os.path.exists(filepath):
@@ -622,45 +2354,318 @@ class Pokedex:
             return False
 
         self.json_path = filepath
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-
-        self.entries = [BasePokemon.from_dict(d) for d in data]
+        reader = Pokedex.iter_jsonl if filepath.lower().endswith(".jsonl") else Pokedex.iter_json
+        self.entries = list(reader(filepath))
         self.dirty = False
-        print(f"Loaded {len(self.entries)} Pokémon from JSON '{self.json_path}'")
+        print(f"Loaded {self.count()} Pokémon from JSON '{self.json_path}'")
+        self._replay_journal(filepath)
         return True
+
+    def load_jsonl(self, filepath="pokemon.jsonl"):
+        """Load Pokémon data from a JSON Lines file into the Pokédex."""
+        return self.load_json(filepath)
     
+    @instrumented(io="write")
     def save_json(self, filepath="pokemon.json"):
-        """Save all Pokémon entries to a JSON file."""
+        """Save all Pokémon entries to a JSON file, writing one entry at a time."""
+        self._materialize()
         self.json_path = filepath
-        data = [p.to_dict() for p in self.entries]
-        with open(self.json_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        with atomic_write(self.json_path) as f:
+            if filepath.lower().endswith(".jsonl"):
+                for p in self._store.values():
+                    f.write(json.dumps(p.to_dict()) + "\n")
+            else:
+                # same layout as json.dump(list, indent=4)
+                sep = "[\n"
+                for p in self._store.values():
+                    item = json.dumps(p.to_dict(), indent=4)
+                    f.write(sep + "    " + item.replace("\n", "\n    "))
+                    sep = ",\n"
+                f.write("\n]" if sep == ",\n" else "[]")
+        self._drop_journal(self.json_path)
         print(f"Pokédex data saved to JSON file '{self.json_path}'")
         return self.json_path    
+
+    def save_jsonl(self, filepath="pokemon.jsonl"):
+        """Save all Pokémon entries to a JSON Lines file."""
+        return self.save_json(filepath)
     
+    # Bulk import (CSV / JSON Lines / rows)
+    @instrumented
+    def import_rows(self, rows, first_row=1):
+        """Validate a batch of rows (see Validator.check_rows), add every valid one
+        in a single add_many and return {"added": n, "errors": [(row, message)]}.
+        Row numbers count from first_row."""
+        with gc_paused():
+            return self._import_checked(Validator.check_rows(rows), first_row)
+
+    def _import_checked(self, checked, first_row):
+        valid, errors = checked
+        with gc_paused():
+            pokemons = [klass(national_no=no, name=name, species=species, height_m=h, weight_kg=w,
+                              abilities=abilities, stats=Stats.from_values(stats))
+                        for _, klass, no, name, species, h, w, abilities, stats in valid]
+            added = self.add_many(pokemons)
+        return {"added": added, "errors": [(i + first_row, msg) for i, msg in errors]}
+
+    @instrumented(io="read")
+    def import_csv(self, filepath):
+        """Import a CSV file with a header row naming the fields (the columns of
+        to_row(); extra columns such as total are ignored)."""
+        with gc_paused():
+            with open(filepath, "r", encoding="utf-8", newline="") as f:
+                reader = csv.reader(f)
+                header = [h.strip() for h in next(reader, [])]
+                records = list(reader)
+            if len({len(r) for r in records}) > 1:      # ragged rows: pad / cut to the header
+                records = [(r + [""] * len(header))[:len(header)] for r in records]
+            columns = dict(zip(header, zip(*records))) if records else {}
+            report = self._import_checked(Validator.check_columns(columns, len(records)), 2)
+        print(f"Imported {report['added']} Pokémon from '{filepath}' "
+              f"({len(report['errors'])} rows rejected)")
+        return report
+
+    @instrumented(io="read")
+    def import_jsonl(self, filepath):
+        """Import a JSON Lines file of flat rows or save_jsonl() objects."""
+        rows, numbers, errors = [], [], []
+        with open(filepath, "r", encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    errors.append((number, f"invalid JSON: {e.msg}"))
+                    continue
+                if not isinstance(row, dict):
+                    errors.append((number, "expected a JSON object"))
+                    continue
+                if isinstance(row.get("stats"), dict):
+                    row = {**row, **row["stats"]}
+                rows.append(row)
+                numbers.append(number)
+        report = self.import_rows(rows, first_row=0)
+        report["errors"] = sorted(errors + [(numbers[i], msg) for i, msg in report["errors"]])
+        print(f"Imported {report['added']} Pokémon from '{filepath}' "
+              f"({len(report['errors'])} rows rejected)")
+        return report
+
+    # Columnar export (CSV / NumPy .npz)
+    EXPORT_COLUMNS = ("national_no", "name", "type", "species", "height_m", "weight_kg",
+                      "abilities") + Stats.FIELDS + ("total",)    # same names as to_row()
+    _TEXT_COLUMNS = ("national_no", "name", "type", "species", "abilities")
+
+    _EXPORT_GETTERS = {
+        "national_no": BasePokemon.get_national_no,
+        "name": BasePokemon.get_name,
+        "type": lambda p: p.TYPE_NAME,
+        "species": BasePokemon.get_species,
+        "height_m": BasePokemon.get_height,
+        "weight_kg": BasePokemon.get_weight,
+        "abilities": lambda p: ";".join(p.get_abilities()),
+    }
+
+    def _export_chunks(self, chunk_size, columns=EXPORT_COLUMNS):
+        """Yield {column: values} for chunk_size entries at a time, in insertion
+        order. Only the requested columns are produced: text as lists of str
+        (abilities joined with ';'), height_m/weight_kg as float arrays and the
+        stats/total as int arrays straight from the stats store (or from the
+        snapshot records in lazy mode)."""
+        if self._lazy is not None:
+            snap = self._lazy.snapshot
+            for start in range(0, len(snap), chunk_size):
+                stop = min(start + chunk_size, len(snap))
+                records = snap.records[start:stop]
+                stats = records["stats"].astype(np.int64)
+                chunk = {}
+                for c in columns:
+                    if c == "abilities":
+                        chunk[c] = [";".join(snap.text_fields(i)[2]) for i in range(start, stop)]
+                    elif c in Pokedex._TEXT_COLUMNS:
+                        chunk[c] = [snap.string(int(i)) for i in records[c]]
+                    elif c in ("height_m", "weight_kg"):
+                        chunk[c] = records[c].astype(np.float64)
+                    else:
+                        chunk[c] = stats.sum(axis=1) if c == "total" else stats[:, Stats._INDEX[c]]
+                yield chunk
+            return
+        store = self._stats
+        rows = np.flatnonzero(store.codes[:store.size] >= 0)
+        rows = rows[np.argsort(store.owners[rows], kind="stable")]
+        for start in range(0, len(rows), chunk_size):
+            part = rows[start:start + chunk_size]
+            stats = store.data[part]
+            pokemons = None
+            chunk = {}
+            for c in columns:
+                getter = Pokedex._EXPORT_GETTERS.get(c)
+                if getter is None:
+                    chunk[c] = stats.sum(axis=1) if c == "total" else stats[:, Stats._INDEX[c]]
+                    continue
+                if pokemons is None:
+                    pokemons = [self._store[h] for h in store.owners[part].tolist()]
+                values = list(map(getter, pokemons))
+                chunk[c] = values if c in Pokedex._TEXT_COLUMNS else np.array(values, dtype=np.float64)
+            yield chunk
+
+    @instrumented(io="write")
+    def export_csv(self, filepath="pokemon.csv", chunk_size=10000):
+        """Export all entries as CSV (one row per Pokémon, columns as to_row()),
+        streaming chunk_size rows at a time through a buffered writer.
+        The file can be read back with import_csv()."""
+        with atomic_write(filepath, encoding="utf-8") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            writer.writerow(Pokedex.EXPORT_COLUMNS)
+            for chunk in self._export_chunks(chunk_size):
+                writer.writerows(zip(*(
+                    map(str, values.tolist()) if c in ("height_m", "weight_kg")
+                    else values.tolist() if isinstance(values, np.ndarray) else values
+                    for c, values in chunk.items())))
+        print(f"Exported {self.count()} Pokémon to CSV '{filepath}'")
+        return filepath
+
+    @instrumented(io="write")
+    def export_npz(self, filepath="pokemon.npz", chunk_size=10000, compress=False):
+        """Export all entries as a NumPy .npz bundle with one array per column
+        (fixed-width str for text, float64 for height/weight, int64 for stats and
+        total), loadable with np.load. Each column is streamed chunk by chunk
+        into the archive; a first pass over the text finds the string widths."""
+        n = self.count()
+        widths = dict.fromkeys(Pokedex._TEXT_COLUMNS, 1)
+        for chunk in self._export_chunks(chunk_size, Pokedex._TEXT_COLUMNS):
+            for c, values in chunk.items():
+                widths[c] = max(widths[c], max(map(len, values), default=1))
+        dtypes = {c: np.dtype(f"<U{widths[c]}") for c in Pokedex._TEXT_COLUMNS}
+        dtypes.update(dict.fromkeys(("height_m", "weight_kg"), np.dtype("<f8")))
+        dtypes.update(dict.fromkeys(Stats.FIELDS + ("total",), np.dtype("<i8")))
+
+        method = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+        with atomic_write(filepath, "wb") as f, \
+                zipfile.ZipFile(f, "w", compression=method, allowZip64=True) as zf:
+            for name in Pokedex.EXPORT_COLUMNS:
+                with zf.open(name + ".npy", "w", force_zip64=True) as out:
+                    np.lib.format.write_array_header_1_0(out, {
+                        "descr": np.lib.format.dtype_to_descr(dtypes[name]),
+                        "fortran_order": False, "shape": (n,)})
+                    for chunk in self._export_chunks(chunk_size, (name,)):
+                        out.write(np.asarray(chunk[name], dtype=dtypes[name]).tobytes())
+        print(f"Exported {n} Pokémon to NumPy bundle '{filepath}'")
+        return filepath
+
+    # File I/O (binary snapshot)
+    @instrumented(io="write")
+    def save_snapshot(self, filepath="pokemon.pdx"):
+        """Save all Pokémon entries to a binary snapshot file."""
+        self._materialize()
+        self.snapshot_path = filepath
+        Snapshot.write(filepath, self._store.values())
+        self._drop_journal(filepath)
+        print(f"Pokédex snapshot saved to '{filepath}'")
+        return filepath
+
+    @instrumented(io="read")
+    def load_snapshot(self, filepath="pokemon.pdx", lazy=False, cache_size=1024):
+        """Load Pokémon data from a binary snapshot file.
+        With lazy=True records stay in the memory-mapped file and are decoded on
+        access (at most cache_size kept); the first change through the Pokédex decodes
+        everything. Until then the returned Pokémon's stats are read-only."""
+        if not os.path.exists(filepath):
+            print(f"Snapshot file '{filepath}' not found.")
+            return False
+
+        snap = Snapshot(filepath)
+        if lazy:
+            self.entries = []
+            self._lazy = LazyEntries(snap, cache_size)
+            self.snapshot_path = filepath
+            self.dirty = False
+            print(f"Opened {self.count()} Pokémon lazily from snapshot '{filepath}'")
+            self._replay_journal(filepath)
+            return True
+        try:
+            loaded = [snap.record(i) for i in range(len(snap))]
+        finally:
+            snap.close()
+        self.entries = loaded
+        self.snapshot_path = filepath
+        self.dirty = False
+        print(f"Loaded {self.count()} Pokémon from snapshot '{filepath}'")
+        self._replay_journal(filepath)
+        return True
+
+    # Multi-file loading
+    @staticmethod
+    def iter_file(filepath):
+        """Yield Pokémon from a .txt, .json, .jsonl or .pdx file."""
+        lower = filepath.lower()
+        if lower.endswith(".txt"):
+            yield from Pokedex.iter_text(filepath)
+        elif lower.endswith(".json"):
+            yield from Pokedex.iter_json(filepath)
+        elif lower.endswith(".jsonl"):
+            yield from Pokedex.iter_jsonl(filepath)
+        elif lower.endswith(".pdx"):
+            snap = Snapshot(filepath)
+            try:
+                for i in range(len(snap)):
+                    yield snap.record(i)
+            finally:
+                snap.close()
+        else:
+            raise ValueError(f"Unsupported file type: '{filepath}'")
+
+    @instrumented(io="read")
+    def load_many(self, paths, workers=None):
+        """Load and merge several shard files, parsing them in worker processes.
+
+        Entries keep the order of their first appearance (paths in the given order,
+        then file order). When a national number occurs more than once the last
+        occurrence wins, so later shards override earlier ones."""
+        paths = list(paths)
+        missing = [p for p in paths if not os.path.exists(p)]
+        if missing:
+            raise FileNotFoundError(f"Shard file(s) not found: {', '.join(missing)}")
+
+        workers = min(workers or os.cpu_count() or 1, len(paths)) if paths else 1
+        if workers <= 1:
+            shards = map(_parse_shard, paths)
+            merged = Pokedex._merge_shards(shards)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                merged = Pokedex._merge_shards(pool.map(_parse_shard, paths))
+
+        self.entries = [BasePokemon.from_record(r) for r in merged]
+        self.text_path = self.json_path = self.snapshot_path = ""
+        self.dirty = False
+        print(f"Loaded {self.count()} Pokémon from {len(paths)} file(s)")
+        return self.count()
+
+    @staticmethod
+    def _merge_shards(shards):
+        merged = {}     # national number -> record
+        for records in shards:
+            for r in records:
+                merged[r[2]] = r
+        return list(merged.values())
+
     # Type report export
+    @instrumented
     def export_type_report(self, typeName, outDir="."):
         """Export a text report summarizing all Pokémon of a given type."""
         wanted = str(typeName).strip().lower()
 
-        if wanted == "fire":
-            avgs = FireType.calculate_average(self.entries)
-            type_info = FireType.TYPE_INFO
-        elif wanted == "grass":
-            avgs = GrassType.calculate_average(self.entries)
-            type_info = GrassType.TYPE_INFO
-        else:
+        type_cls = TypeRegistry.type_class(wanted)
+        if type_cls is None:
             return None
+        avgs = self.calculate_average(wanted)
+        type_info = type_cls.TYPE_INFO
 
-        selected = [
-            p for p in self.entries
-            if getattr(p.__class__, "TYPE_NAME", "").lower() == wanted
-        ]
+        selected = self.find_by_type(wanted)
         if not selected:
             return None
 
-        filename = f"{wanted}.txt"
         filename = f"{wanted}.txt"
         path = os.path.join(outDir, filename)
         with open(path, "w", encoding="utf-8") as f:
@@ -678,6 +2683,20 @@ class Pokedex:
     
 
 
+def _parse_shard(filepath):
+    """Worker for Pokedex.load_many: parse one file into compact records."""
+    return [p.to_record() for p in Pokedex.iter_file(filepath)]
+
+def _parse_text_range(job):
+    """Worker for Pokedex.load: parse one (path, start, end) byte range of a text file."""
+    filepath, start, end = job
+    with open(filepath, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    return [p.to_record() for p in Pokedex._parse_lines(text.splitlines())]
+
+
+
 # -----------------------
 # Validator
 # -----------------------
@@ -690,6 +2709,16 @@ class Validator:
     _re_name = re.compile(r"^[A-Za-z ]+$")
     _re_abilities = re.compile(r"^[A-Za-z ,;]+$")
 
+    # bulk import: also accept the plain values written by save()/export ('0034', '1.7')
+    _re_batch_no = re.compile(r"(?:No\. )?\d{4}")
+    _re_batch_height = re.compile(r"\d+(?:\.\d{1,2})?(?: m)?")
+    _re_batch_weight = re.compile(r"\d+(?:\.\d{1,2})?(?: kg)?")
+    _re_batch_species = re.compile(r"[^\W\d_]+(?: [^\W\d_]+)*")     # letters incl. 'é'
+    _re_batch_stat = re.compile(r"\d+")
+    _column_patterns = {}   # pattern -> pattern for a whole newline-joined column
+    BATCH_FIELDS = ("national_no", "name", "type", "species", "height_m", "weight_kg",
+                    "abilities") + Stats.FIELDS
+
     # check methods
     @staticmethod
     def valid_national_no(value: str):
@@ -734,6 +2763,98 @@ class Validator:
             raise ValueError("Weight must include a space and unit, e.g., '6.90 kg'.")
         return float(value.split()[0])
 
+    # batch validation
+    @staticmethod
+    def check_column(values, pattern):
+        """Return the indexes of the values (a list of str) that do not fully match
+        pattern. The whole column is first checked with one regex call over the
+        newline-joined values; only if that fails are the values tested one by one."""
+        joined_pattern = Validator._column_patterns.get(pattern)
+        if joined_pattern is None:
+            p = pattern.pattern.lstrip("^").rstrip("$")
+            joined_pattern = re.compile(f"(?:{p})(?:\n(?:{p}))*")
+            Validator._column_patterns[pattern] = joined_pattern
+        joined = "\n".join(values)
+        if joined.count("\n") == len(values) - 1 and joined_pattern.fullmatch(joined):
+            return []
+        return [i for i, v in enumerate(values) if not pattern.fullmatch(v)]
+
+    @staticmethod
+    def _text_column(values):
+        """Return the values as a list of stripped str ('' for None, lists joined
+        with ';'), so a row validates the same whatever else is in the batch."""
+        values = list(values)
+        if set(map(type, values)) <= {str}:
+            return [v.strip() for v in values]
+        return [(v if type(v) is str else "" if v is None
+                 else ";".join(map(str, v)) if isinstance(v, (list, tuple)) else str(v)).strip()
+                for v in values]
+
+    @staticmethod
+    def check_rows(rows):
+        """Validate a batch of import rows (dicts keyed by BATCH_FIELDS); see check_columns."""
+        rows = rows if isinstance(rows, list) else list(rows)
+        return Validator.check_columns(
+            {f: [r.get(f) for r in rows] for f in Validator.BATCH_FIELDS}, len(rows))
+
+    @staticmethod
+    def check_columns(columns, count):
+        """Validate count rows given column-wise (field -> values; abilities are
+        ';'-separated or lists), one column at a time with the precompiled patterns.
+        Returns (valid, errors): valid holds (row index, class, national_no, name,
+        species, height_m, weight_kg, abilities, stats) tuples ready for the
+        constructor, errors holds (row index, message) pairs."""
+        problems = {}       # row index -> messages
+
+        def column(field):
+            values = columns.get(field)
+            return [""] * count if values is None else Validator._text_column(values)
+
+        def check(field, pattern, message, convert=None):
+            values = column(field)
+            for i in Validator.check_column(values, pattern):
+                problems.setdefault(i, []).append(f"{field}: {message}")
+                values[i] = "0"         # placeholder; the row is rejected anyway
+            return values if convert is None else list(map(convert, values))
+
+        nos = check("national_no", Validator._re_batch_no, "expected 'No. 0034' or '0034'",
+                    lambda v: v[-4:])
+        names = check("name", Validator._re_name, "use only letters and spaces")
+        species = check("species", Validator._re_batch_species, "use only letters and spaces")
+        unit_value = lambda v: float(v.split()[0])
+        heights = check("height_m", Validator._re_batch_height, "expected e.g. '1.7' or '1.70 m'",
+                        unit_value)
+        weights = check("weight_kg", Validator._re_batch_weight, "expected e.g. '6.9' or '6.90 kg'",
+                        unit_value)
+        stats = list(zip(*[check(f, Validator._re_batch_stat, "expected a non-negative integer", int)
+                           for f in Stats.FIELDS]))
+
+        raw = column("abilities")
+        for i in Validator.check_column(raw, Validator._re_abilities):
+            if raw[i]:
+                problems.setdefault(i, []).append(
+                    "abilities: use only letters, commas, or semicolons")
+        split = {}          # the same abilities text is split (and interned) once
+        abilities = [split[v] if v in split else
+                     split.setdefault(v, _intern_all(a.strip() for a in v.split(";") if a.strip()))
+                     for v in raw]
+
+        valid, errors = [], []
+        types = column("type")
+        named = TypeRegistry.named_classes()
+        generic = {t: TypeRegistry.generic_class(t) for t in set(types)}
+        for i, name in enumerate(names):
+            klass = named.get(name.lower()) or generic[types[i]]
+            found = problems.get(i)
+            if klass is None:
+                found = (found or []) + [f"type: expected one of {', '.join(TypeRegistry.type_names())}"]
+            if found:
+                errors.append((i, "; ".join(found)))
+            else:
+                valid.append((i, klass, nos[i], name, species[i], heights[i], weights[i],
+                               abilities[i], stats[i]))
+        return valid, errors
+
 
 
 
@@ -741,6 +2862,7 @@ class Validator:
 # Visualizer
 # ---------------------------
 
+@Metrics.watch
 class Visualizer:
     """Matplotlib charts for pokédex stats."""
     # fixed order across all charts
@@ -749,6 +2871,7 @@ class Visualizer:
 
     # Bar chart: one Pokémon’s attributes
     @staticmethod
+    @instrumented
     def bar_stats_single(pokemon, save_path=None):
         if pokemon is None:
             print("No Pokémon provided.")
@@ -766,24 +2889,23 @@ class Visualizer:
         if save_path: plt.savefig(save_path, dpi=150); print(f"Saved {save_path}"); plt.close()
         else: plt.show()
 
-    # Line chart: Fire vs Grass averages across the same ordered attributes
+    # Line chart: per-type averages (every registered type) across the same ordered attributes
     @staticmethod
+    @instrumented
     def line_type_averages(pokemons, save_path=None):
-        fire_avg = FireType.calculate_average(pokemons) or {}
-        grass_avg = GrassType.calculate_average(pokemons) or {}
-        if not fire_avg and not grass_avg:
+        types = TypeRegistry.type_names()
+        avgs = [TypeRegistry.type_class(t).calculate_average(pokemons) or {} for t in types]
+        if not any(avgs):
             print("No data to plot.")
             return
 
         x = np.arange(len(Visualizer.STAT_ORDER))
-        fire_vals = np.array([fire_avg.get(k, 0) for k in Visualizer.STAT_ORDER])
-        grass_vals = np.array([grass_avg.get(k, 0) for k in Visualizer.STAT_ORDER])
-
         plt.figure()
-        plt.plot(x, fire_vals, marker="o", label="Fire")
-        plt.plot(x, grass_vals, marker="o", label="Grass")
+        for type_name, avg in zip(types, avgs):
+            vals = np.array([avg.get(k, 0) for k in Visualizer.STAT_ORDER])
+            plt.plot(x, vals, marker="o", label=type_name)
         plt.xticks(x, Visualizer.STAT_LABELS)
-        plt.title("Type Averages — Fire vs Grass (Line Chart)")
+        plt.title(f"Type Averages — {' vs '.join(types)} (Line Chart)")
         plt.xlabel("Attributes")
         plt.ylabel("Average Value")
         plt.grid(True, linestyle="--", linewidth=0.5)
@@ -794,6 +2916,7 @@ class Visualizer:
 
     # Pie chart: one Pokémon’s distribution
     @staticmethod
+    @instrumented
     def pie_stats(pokemon, save_path=None):
         if pokemon is None:
             print("No Pokémon provided.")
@@ -808,6 +2931,98 @@ class Visualizer:
         if save_path: plt.savefig(save_path, dpi=150); print(f"Saved {save_path}"); plt.close()
         else: plt.show()
 
+    # Batch rendering: bar/pie PNGs for every Pokémon
+    CHART_KINDS = ("bar", "pie")
+
+    @staticmethod
+    @instrumented
+    def render_all(dex, kinds=CHART_KINDS, out_dir=".", workers=1):
+        """Save the bar and/or pie chart of every Pokémon in dex (or any list of
+        Pokémon) as out_dir/<position>_<name>_<kind>.png and return the paths.
+        Charts look like bar_stats_single/pie_stats, but each worker draws on one
+        reused object-oriented Agg figure per kind instead of pyplot's global
+        state. workers > 1 (None = one per CPU) fans the Pokémon out to processes.
+        Pie charts of Pokémon whose stats are all zero are skipped."""
+        kinds = tuple(kinds)
+        unknown = set(kinds) - set(Visualizer.CHART_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown chart kind(s): {', '.join(sorted(unknown))}")
+        pokemons = dex.get_entries() if isinstance(dex, Pokedex) else dex
+        os.makedirs(out_dir, exist_ok=True)
+        width = len(str(max(len(pokemons) - 1, 0)))
+        items = []
+        for i, p in enumerate(pokemons):
+            safe_name = re.sub(r"[^\w-]+", "_", p.get_name())
+            stem = f"{i:0{width}d}_{safe_name}"
+            items.append((os.path.join(out_dir, stem), p.get_name(), p.get_stats().get_values()))
+
+        if workers is None or workers > 1:
+            workers = workers or os.cpu_count() or 1
+            size = max(1, -(-len(items) // (workers * 4)))
+            jobs = [(kinds, items[i:i + size]) for i in range(0, len(items), size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                paths = [path for batch in pool.map(_render_chart_batch, jobs) for path in batch]
+        else:
+            paths = _render_chart_batch((kinds, items))
+        print(f"Saved {len(paths)} chart(s) to '{out_dir}'")
+        return paths
+
+
+class _ChartRenderer:
+    """Reusable Agg figures for Visualizer.render_all. The bar chart's artists are
+    created once and only their heights, limits and title change per Pokémon;
+    the pie is redrawn on the same axes (wedges cannot be resized in place)."""
+
+    DPI = 150
+
+    def __init__(self):
+        self.bar_fig = Figure()
+        FigureCanvasAgg(self.bar_fig)
+        ax = self.bar_ax = self.bar_fig.add_subplot()
+        self.bars = ax.bar(Visualizer.STAT_LABELS, np.zeros(len(Visualizer.STAT_ORDER)))
+        self.bar_title = ax.set_title("")
+        ax.set_xlabel("Attributes")
+        ax.set_ylabel("Value")
+        ax.grid(axis="y", linestyle="--", linewidth=0.5)
+        self._bar_layout = None     # tight layout, computed for the first chart only
+
+        self.pie_fig = Figure()
+        FigureCanvasAgg(self.pie_fig)
+        self.pie_ax = self.pie_fig.add_subplot()
+
+    def bar(self, path, name, values):
+        for rect, v in zip(self.bars, values):
+            rect.set_height(v)
+        self.bar_ax.set_ylim(0, max(values) * 1.05 or 1)
+        self.bar_title.set_text(f"{name} — Attribute Bar Chart")
+        if self._bar_layout is None:
+            self.bar_fig.tight_layout()
+            self._bar_layout = True
+        self.bar_fig.savefig(path, dpi=_ChartRenderer.DPI)
+
+    def pie(self, path, name, values):
+        ax = self.pie_ax
+        ax.clear()
+        ax.pie(values, labels=Visualizer.STAT_LABELS, autopct="%1.1f%%", startangle=90)
+        ax.set_title(f"{name} — Stat Distribution")
+        ax.axis("equal")
+        self.pie_fig.savefig(path, dpi=_ChartRenderer.DPI)
+
+
+def _render_chart_batch(job):
+    """Worker for Visualizer.render_all: render (path stem, name, stats) items."""
+    kinds, items = job
+    renderer = _ChartRenderer()
+    paths = []
+    for stem, name, values in items:
+        for kind in kinds:
+            if kind == "pie" and not any(values):
+                continue
+            path = f"{stem}_{kind}.png"
+            getattr(renderer, kind)(path, name, values)
+            paths.append(path)
+    return paths
+
 
 
 
@@ -837,26 +3052,25 @@ def prompt_int(msg):
         except: print("Invalid integer. Try again (or X to cancel).")
 
 def detect_and_load(dex, path):
-    """Load based on file extension (.txt or .json)."""
-    if path.lower().endswith(".json"):
+    """Load based on file extension (.txt, .json, .jsonl or .pdx)."""
+    if path.lower().endswith(".pdx"):
+        dex.load_snapshot(path)
+    elif path.lower().endswith(".json"):
         dex.load_json(path)
+    elif path.lower().endswith(".jsonl"):
+        dex.load_jsonl(path)
     elif path.lower().endswith(".txt"):
         dex.load(path)
     else:
-        raise ValueError("Unsupported file type. Use .txt or .json.")
+        raise ValueError("Unsupported file type. Use .txt, .json, .jsonl or .pdx.")
 
 def save_back(dex):
     """Save back to the same file type that was loaded."""
     try:
-        if dex.json_path:
-            dex.save_json(dex.json_path)
-        elif dex.text_path:
-            dex.save(dex.text_path)
-        else:
+        if dex.flush(force=True) is None:
             print("No file loaded — please use 'S' to specify save file.")
             return
         print("Saved back to original file.")
-        dex.dirty = False
     except Exception as e:
         print("Save failed:", e)
 
@@ -867,9 +3081,11 @@ def save_back(dex):
 # ---------------------------
 def main():
     dex = Pokedex.get_instance()
+    if os.environ.get("POKEDEX_METRICS"):
+        Metrics.enable()
 
     # Initial load
-    path = input("Enter file path (.txt or .json) or press Enter to skip: ").strip()
+    path = input("Enter file path (.txt, .json, .jsonl or .pdx) or press Enter to skip: ").strip()
     if path:
         try:
             detect_and_load(dex, path)
@@ -877,16 +3093,20 @@ def main():
             print("Load failed:", e)
     else:
         print("Starting with an empty Pokédex.")
+    # changes are journaled right away and written back to the file in batches
+    dex.enable_journal()
+    dex.enable_write_behind()
 
     # Main loop
     while True:
+        dex.flush_if_due()
         print("\n--- POKEDEX MENU ---")
         print("1) List all Pokémon")
         print("2) Search Pokémon")
         print("3) Update Pokémon stat")
         print("4) Remove Pokémon")
         print("5) Add new Pokémon")
-        print("6) Export type report (Fire/Grass)")
+        print(f"6) Export type report ({'/'.join(TypeRegistry.type_names())})")
         print("7) Visualize stats")
         print("8) Update basic info (No./Height/Weight)")
         print("S) Save")
@@ -896,6 +3116,10 @@ def main():
 
         # Exit
         if choice in ("x", "exit"):
+            try:
+                dex.flush()
+            except Exception as e:
+                print("Save failed:", e)
             if dex.dirty:
                 savep = input("Save changes before exiting? (y/n): ").strip().lower()
                 if savep == "y":
@@ -919,11 +3143,21 @@ def main():
             print("  1) Name")
             print("  2) National number (format: No. 0004)")
             print("  3) Type")
+            print("  4) Ability")
+            print("  5) Species")
             sub = input("Choose option: ").strip()
             try:
                 if sub == "1":
                     name = input("Name: ").strip()
-                    p = dex.find_by_name(name)
+                    try:
+                        p = dex.find_by_name(name)
+                    except PokemonNotFoundError as e:
+                        print(e)
+                        names = dict.fromkeys(m.get_name() for m in dex.search(name, fields=("name",)))
+                        names.update(dict.fromkeys(dex.complete(name, limit=5)))
+                        if names:
+                            print("Did you mean:", ", ".join(list(names)[:5]) + "?")
+                        continue
                     print(p.display())
                 elif sub == "2":
                     raw_no = input("National Number (format: No. 0004): ").strip()
@@ -935,7 +3169,7 @@ def main():
                     p = dex.find_by_national_no(no)
                     print(p.display())
                 elif sub == "3":
-                    t = input("Type (Fire/Grass): ").strip()
+                    t = input(f"Type ({'/'.join(TypeRegistry.type_names())}): ").strip()
                     pokemons = dex.find_by_type(t)
                     if pokemons:
                         for p in pokemons:
@@ -943,6 +3177,21 @@ def main():
                             print("-" * 40)
                     else:
                         print(f"No Pokémon of type {t} found.")
+                elif sub in ("4", "5"):
+                    label = "Ability" if sub == "4" else "Species"
+                    hint = "all must match" if sub == "4" else "any may match"
+                    text = input(f"{label} (several separated by ';', {hint}): ").strip()
+                    keys = [k.strip() for k in text.split(";") if k.strip()]
+                    if sub == "4":
+                        pokemons = dex.find_by_ability(*keys)
+                    else:
+                        pokemons = dex.find_by_species(*keys)
+                    if pokemons:
+                        for p in pokemons:
+                            print(p.display())
+                            print("-" * 40)
+                    else:
+                        print(f"No Pokémon found with {label.lower()} {text}.")
                 else:
                     print("Invalid option.")
             except PokemonNotFoundError as e:
@@ -959,8 +3208,7 @@ def main():
                 field = input("Field (hp/attack/defense/sp_atk/sp_def/speed): ").strip()
                 value = input("New value (int): ").strip()
                 if dex.update_by_name(name, field, value):
-                    save_back(dex)
-                    print("Updated and saved.")
+                    print("Updated.")
                 else:
                     print("Update failed.")
             elif sub == "2":
@@ -973,8 +3221,7 @@ def main():
                 field = input("Field (hp/attack/defense/sp_atk/sp_def/speed): ").strip()
                 value = input("New value (int): ").strip()
                 if dex.update_by_national_no(no, field, value):
-                    save_back(dex)
-                    print("Updated and saved.")
+                    print("Updated.")
                 else:
                     print("Update failed.")
             else:
@@ -987,8 +3234,7 @@ def main():
             if sub == "1":
                 name = input("Name: ").strip()
                 if dex.remove_by_name(name):
-                    save_back(dex)
-                    print("Removed and saved.")
+                    print("Removed.")
                 else:
                     print("Not found.")
             elif sub == "2":
@@ -999,8 +3245,7 @@ def main():
                     print(e)
                     continue
                 if dex.remove_by_national_no(no):
-                    save_back(dex)
-                    print("Removed and saved.")
+                    print("Removed.")
                 else:
                     print("Not found.")
             else:
@@ -1009,13 +3254,13 @@ def main():
         # Option 5: Add new pokemon
         elif choice == "5":
             print("Add new Pokémon")
-            ptype = input("Type (Fire/Grass): ").strip().lower()
-            if ptype not in ("fire", "grass"):
-                print("Invalid type! Only Fire or Grass allowed.")
-                continue
-
+            type_names = TypeRegistry.type_names()
+            ptype = input(f"Type ({'/'.join(type_names)}): ").strip().lower()
             # Choose class dynamically
-            klass = GenericFirePokemon if ptype == "fire" else GenericGrassPokemon
+            klass = TypeRegistry.generic_class(ptype)
+            if klass is None:
+                print(f"Invalid type! Only {' or '.join(type_names)} allowed.")
+                continue
 
             # ------- VALIDATED INPUT -------
             raw_no = prompt_nonempty("National Number (format: No. 0025): ")
@@ -1063,14 +3308,13 @@ def main():
                         height_m=height_val, weight_kg=weight_val,
                         abilities=abilities_list, stats=s)
                 dex.add(p)
-                save_back(dex)
-                print(f"{ptype.capitalize()} Pokémon added and saved.")
+                print(f"{ptype.capitalize()} Pokémon added.")
             except Exception as e:
                 print("Add failed:", e)
 
         # Option 6: Export type report
         elif choice == "6":
-            t = input("Type name (Fire/Grass): ").strip()
+            t = input(f"Type name ({'/'.join(TypeRegistry.type_names())}): ").strip()
             try:
                 path = dex.export_type_report(t)
                 print("Exported:", path)
@@ -1084,10 +3328,19 @@ def main():
                 continue
             print("Choose visualization type:")
             print("  1) Bar chart (single Pokémon’s stats)")
-            print("  2) Line chart (Fire vs Grass averages)")
+            print(f"  2) Line chart ({' vs '.join(TypeRegistry.type_names())} averages)")
             print("  3) Pie chart (single Pokémon’s stat distribution)")
+            print("  4) Bar and pie charts for every Pokémon (saved to a folder)")
             sub = input("Select option: ").strip()
 
+            if sub == "4":
+                out_dir = input("Folder (e.g., charts): ").strip() or "charts"
+                try:
+                    Visualizer.render_all(dex, out_dir=out_dir, workers=None)
+                except Exception as e:
+                    print("Visualization failed:", e)
+                continue
+
             save = input("Save chart to file? (y/n): ").strip().lower()
             save_path = input("Filename (e.g., chart.png): ").strip() if save == "y" else None
 
@@ -1097,7 +3350,7 @@ def main():
                     p = dex.find_by_name(name)
                     Visualizer.bar_stats_single(p, save_path)
                 elif sub == "2":
-                    Visualizer.line_type_averages(dex.get_entries(), save_path)
+                    Visualizer.line_type_averages(dex, save_path)
                 elif sub == "3":
                     name = input("Enter Pokémon name: ").strip()
                     p = dex.find_by_name(name)
@@ -1156,10 +3409,8 @@ def main():
                     print("Invalid field.")
                     continue
 
-                p.set_basic_info(cur_name, new_no, cur_species, new_h, new_w, cur_abilities)
-                dex.dirty = True
-                save_back(dex)
-                print("Updated and saved.")
+                dex.set_basic_info(p, cur_name, new_no, cur_species, new_h, new_w, cur_abilities)
+                print("Updated.")
 
             except PokemonNotFoundError as e:
                 print(e)
@@ -1171,6 +3422,14 @@ def main():
         elif choice == "s":
             save_back(dex)
 
+        # Hidden option M: metrics (first use turns them on)
+        elif choice == "m":
+            if not Metrics.enabled:
+                Metrics.enable()
+                print("Metrics enabled.")
+            else:
+                print(Metrics.report())
+
         else:
             print("Invalid option.")
 
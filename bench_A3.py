@@ -0,0 +1,370 @@
+# bench_A3.py
+# Benchmarks for the Pokédex
+#
+#   python bench_A3.py --sizes 1000,10000 --out results.json
+#   python bench_A3.py --sizes 1000,10000 --baseline results.json   # flag regressions
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")       # charts are rendered to files only
+
+import numpy as np
+
+from A3 import (
+    Stats, Pokedex, Visualizer, FireType, GrassType,
+    Charmander, Vulpix, Bulbasaur, Oddish, GenericFirePokemon, GenericGrassPokemon,
+)
+
+
+# ---------------------------
+# Memory: compact vs dict-based objects
+# ---------------------------
+
+class _DictStats:
+    """Stats laid out like the original class: six name-mangled ints in __dict__."""
+    def __init__(self, hp, attack, defense, sp_atk, sp_def, speed):
+        self.__hp = int(hp)
+        self.__attack = int(attack)
+        self.__defense = int(defense)
+        self.__sp_atk = int(sp_atk)
+        self.__sp_def = int(sp_def)
+        self.__speed = int(speed)
+
+
+class _DictPokemon:
+    """Pokémon laid out like the original class: __dict__ and list-backed abilities."""
+    TYPE_NAME = "Fire"
+
+    def __init__(self, national_no, name, species, height_m, weight_kg, abilities, stats):
+        self.__national_no = str(national_no)
+        self.__name = name
+        self.__species = species
+        self.__height_m = float(height_m)
+        self.__weight_kg = float(weight_kg)
+        self.__abilities = list(abilities)
+        self.__stats = stats
+
+
+def _build(n, pokemon_cls, stats_cls):
+    out = []
+    for i in range(n):
+        # fresh strings per entry, as a parser would produce
+        species = "".join(["Lizard ", "Pokémon"])
+        abilities = "Blaze;Solar Power".split(";")
+        out.append(pokemon_cls(national_no=str(i).zfill(4), name=f"Mon{i}",
+                               species=species, height_m=0.6, weight_kg=8.5,
+                               abilities=abilities,
+                               stats=stats_cls(39, 52, 43, 60, 50, 65)))
+    return out
+
+
+def _traced_size(n, pokemon_cls, stats_cls):
+    tracemalloc.start()
+    objs = _build(n, pokemon_cls, stats_cls)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return size
+
+
+def bench_memory(n=100_000):
+    """Compare traced memory of n dict-based vs compact (__slots__) Pokémon."""
+    before = _traced_size(n, _DictPokemon, _DictStats)
+    after = _traced_size(n, GenericFirePokemon, Stats)
+    print(f"memory  n={n:>9,}  dict-based {before / n:8.1f} B/entry  "
+          f"compact {after / n:8.1f} B/entry  ({after / before:.0%} of before)")
+    return {"n": n, "before_bytes": before, "after_bytes": after}
+
+
+# ---------------------------
+# Text parser: fast path vs original loop
+# ---------------------------
+
+def _legacy_block(block, stats):
+    """The original Pokedex._create_pokemon_from_block, kept as the baseline."""
+    s = Stats(stats.get("HP", 0), stats.get("Attack", 0), stats.get("Defense", 0),
+              stats.get("Special Attack", 0), stats.get("Special Defense", 0),
+              stats.get("Speed", 0))
+    name = block.get("Name", "Unknown")
+    national_no = str(block.get("National Number", "0000")).replace("No. ", "").zfill(4)
+    species = block.get("Species", "???")
+    height = float(str(block.get("Height", "0")).split()[0])
+    weight = float(str(block.get("Weight", "0")).split()[0])
+    abilities = block.get("Abilities", "").split(";")
+    type_name = (block.get("Type", "") or "").strip().lower()
+    lname = name.lower()
+    if lname == "charmander":
+        klass = Charmander
+    elif lname == "vulpix":
+        klass = Vulpix
+    elif lname == "bulbasaur":
+        klass = Bulbasaur
+    elif lname == "oddish":
+        klass = Oddish
+    elif type_name == "fire":
+        klass = GenericFirePokemon
+    elif type_name == "grass":
+        klass = GenericGrassPokemon
+    else:
+        raise ValueError(f"Unknown Type for '{name}'. Provide 'Type: Fire' or 'Type: Grass'.")
+    return klass(national_no=national_no, name=name, species=species,
+                 height_m=height, weight_kg=weight, abilities=abilities, stats=s)
+
+
+def _legacy_parse(filepath):
+    """The original Pokedex.load loop, kept as the baseline."""
+    with open(filepath, "r", encoding="utf-8") as f:
+        block, stats = {}, {}
+        for line in f:
+            line = line.strip()
+            if not line:
+                if block:
+                    yield _legacy_block(block, stats)
+                    block, stats = {}, {}
+                continue
+            if line.startswith("Stats:"):
+                continue
+            if ":" in line:
+                key, val = line.split(":", 1)
+                key, val = key.strip(), val.strip()
+                if key in ["Total", "HP", "Attack", "Defense",
+                           "Special Attack", "Special Defense", "Speed"]:
+                    stats[key] = int(val.split()[0])
+                else:
+                    block[key] = val
+        if block:
+            yield _legacy_block(block, stats)
+
+
+def write_synthetic_text(filepath, n):
+    """Write n synthetic entries in the pokemon.txt block format."""
+    with open(filepath, "w", encoding="utf-8") as f:
+        for i in range(n):
+            fire = i % 2 == 0
+            f.write(f"Name: Mon{i}\n"
+                    f"National Number: No. {i % 10000:04d}\n"
+                    f"Type: {'Fire' if fire else 'Grass'}\n"
+                    f"Species: {'Lizard' if fire else 'Seed'} Pokémon\n"
+                    f"Height: {i % 30 / 10} m\n"
+                    f"Weight: {i % 900 / 10} kg\n"
+                    f"Abilities: {'Blaze;Solar Power' if fire else 'Overgrow'}\n"
+                    f"Stats:\n"
+                    f"  Total: {6 * (i % 200)}\n"
+                    f"  HP: {i % 200}\n"
+                    f"  Attack: {i % 200}\n"
+                    f"  Defense: {i % 200}\n"
+                    f"  Special Attack: {i % 200}\n"
+                    f"  Special Defense: {i % 200}\n"
+                    f"  Speed: {i % 200}\n\n")
+
+
+def bench_parse(n=1_000_000):
+    """Compare lines/sec of the original loop and Pokedex.iter_text on n entries."""
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    os.close(fd)
+    try:
+        write_synthetic_text(path, n)
+        with open(path, "rb") as f:
+            lines = sum(1 for _ in f)
+        results = {"n": n, "lines": lines}
+        for label, parse in (("original", _legacy_parse), ("fast", Pokedex.iter_text)):
+            start = time.perf_counter()
+            count = sum(1 for _ in parse(path))
+            elapsed = time.perf_counter() - start
+            assert count == n
+            results[label + "_lines_per_sec"] = lines / elapsed
+            print(f"parse   n={n:>9,}  {label:<8} {lines / elapsed:12,.0f} lines/s  ({elapsed:.2f} s)")
+        print(f"parse   speed-up {results['fast_lines_per_sec'] / results['original_lines_per_sec']:.2f}x")
+        return results
+    finally:
+        os.remove(path)
+
+
+# ---------------------------
+# Suite: hot paths on synthetic dexes
+# ---------------------------
+
+def synthetic_entries(n):
+    """Return n synthetic Pokémon, alternating Fire and Grass, with unique names/numbers."""
+    out = []
+    for i in range(n):
+        klass = GenericFirePokemon if i % 2 == 0 else GenericGrassPokemon
+        v = i % 200
+        out.append(klass(national_no=str(i).zfill(4), name=f"Mon{i}",
+                         species="Lizard Pokémon" if i % 2 == 0 else "Seed Pokémon",
+                         height_m=i % 30 / 10, weight_kg=i % 900 / 10,
+                         abilities=["Blaze"] if i % 2 == 0 else ["Overgrow"],
+                         stats=Stats(v, (v * 7) % 200, (v * 3) % 200, v, 200 - v, (v * 5) % 200)))
+    return out
+
+
+def _measure(fn, setup=None, repeat=3, memory=False):
+    """Best wall time of repeat runs of fn() (setup() runs untimed before each),
+    plus the tracemalloc peak of one extra run when memory=True."""
+    result = {}
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    result["seconds"] = best
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        fn()
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run_suite(sizes, repeat=3, memory=False, lookups=1000, charts=10):
+    """Time load/save/search/remove/aggregate/report/chart paths for each dex size."""
+    dex = Pokedex.get_instance()
+    results = {}
+    tmpdir = tempfile.mkdtemp()
+    txt_path = os.path.join(tmpdir, "dex.txt")
+    json_path = os.path.join(tmpdir, "dex.json")
+    try:
+        for n in sizes:
+            entries = synthetic_entries(n)
+            rng = np.random.default_rng(n)
+            picks = rng.integers(0, n, size=min(lookups, n)).tolist()
+            names = [f"Mon{i}" for i in picks]
+            numbers = [str(i).zfill(4) for i in picks]
+
+            def fill():
+                dex.entries = entries
+
+            def reload():
+                dex.load(txt_path)
+
+            def find_names():
+                for name in names:
+                    dex.find_by_name(name)
+
+            def find_numbers():
+                for no in numbers:
+                    dex.find_by_national_no(no)
+
+            def remove_names():
+                for name in names:
+                    dex.remove_by_name(name)
+
+            def remove_numbers():
+                for no in numbers:
+                    dex.remove_by_national_no(no)
+
+            def bar_charts():
+                for i, p in enumerate(entries[:charts]):
+                    Visualizer.bar_stats_single(p, os.path.join(tmpdir, f"bar{i}.png"))
+
+            def pie_charts():
+                for i, p in enumerate(entries[:charts]):
+                    Visualizer.pie_stats(p, os.path.join(tmpdir, f"pie{i}.png"))
+
+            fill()
+            cases = [
+                ("save", lambda: dex.save(txt_path), None),
+                ("save_json", lambda: dex.save_json(json_path), None),
+                ("load", lambda: dex.load(txt_path), None),
+                ("load_json", lambda: dex.load_json(json_path), None),
+                ("find_by_name", find_names, reload),
+                ("find_by_national_no", find_numbers, None),
+                ("find_by_type", lambda: (dex.find_by_type("Fire"), dex.find_by_type("Grass")), None),
+                ("calculate_average[list]", lambda: (FireType.calculate_average(entries),
+                                                     GrassType.calculate_average(entries)), None),
+                ("calculate_average[dex]", lambda: (FireType.calculate_average(dex),
+                                                    GrassType.calculate_average(dex)), None),
+                ("query", lambda: dex.query(type="Fire", speed__gt=100, weight__lt=10,
+                                            order_by="-total", limit=20), None),
+                ("top_by_stat", lambda: (dex.top_by_stat("attack", 10),
+                                         dex.range_by_stat("hp", 50, 80)), None),
+                ("export_type_report", lambda: dex.export_type_report("Fire", tmpdir), None),
+                ("line_type_averages", lambda: Visualizer.line_type_averages(
+                    dex, os.path.join(tmpdir, "line.png")), None),
+                ("bar_stats_single", bar_charts, None),
+                ("pie_stats", pie_charts, None),
+                ("remove_by_name", remove_names, reload),
+                ("remove_by_national_no", remove_numbers, reload),
+            ]
+            for label, fn, setup in cases:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = _measure(fn, setup, repeat, memory)
+                key = f"{label}[n={n}]"
+                results[key] = result
+                peak = f"  peak {result['peak_bytes'] / 1e6:9.2f} MB" if memory else ""
+                print(f"{key:<36} {result['seconds'] * 1000:11.2f} ms{peak}")
+    finally:
+        dex.entries = []
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold=1.25):
+    """Return (key, old, new, ratio) for every timing more than threshold x slower."""
+    regressions = []
+    for key, new in results.items():
+        old = baseline.get(key)
+        if not old or not old.get("seconds"):
+            continue
+        ratio = new["seconds"] / old["seconds"]
+        if ratio > threshold:
+            regressions.append((key, old["seconds"], new["seconds"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pokédex benchmark suite")
+    parser.add_argument("--sizes", default="1000,10000",
+                        help="comma-separated dex sizes, e.g. 1000,10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case (best is kept)")
+    parser.add_argument("--memory", action="store_true", help="also record tracemalloc peaks")
+    parser.add_argument("--out", help="write machine-readable results (JSON) here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="flag cases slower than baseline by more than this factor")
+    parser.add_argument("--extras", action="store_true",
+                        help="also run the memory-layout and parser comparisons")
+    args = parser.parse_args(argv)
+
+    sizes = [int(x) for x in args.sizes.split(",") if x]
+    results = run_suite(sizes, repeat=args.repeat, memory=args.memory)
+    report = {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__,
+                 "machine": platform.machine(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+    }
+    if args.extras:
+        report["extras"] = {"memory": bench_memory(max(sizes)), "parse": bench_parse(max(sizes))}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for key, old, new, ratio in regressions:
+            print(f"REGRESSION {key}: {old * 1000:.2f} ms -> {new * 1000:.2f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"No regressions over {args.threshold:.2f}x against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,18 @@
+import copy
 import os
 import json
+import pickle
 import tempfile
 import unittest
 
+import numpy as np
+
 from A3 import (
     Stats,
-    Bulbasaur, Charmander, BasePokemon,
-    Pokedex, 
+    Bulbasaur, Charmander, Vulpix, BasePokemon, FireType,
+    Pokedex, PokemonNotFoundError, Metrics, TypeRegistry, Visualizer,
 )
+from abc import ABC
 
 class TestSerialization(unittest.TestCase):
     def setUp(self):
@@ -69,5 +74,622 @@ class TestSerialization(unittest.TestCase):
         finally:
             os.remove(json_path)
 
+    @unittest.skipUnless(os.name == "posix", "POSIX permission bits")
+    def test_atomic_write_keeps_permissions(self):
+        """Test atomic rewrites keep a file's mode and give new files the umask default."""
+        self.dex.add(self.bulbasaur)
+        tmpdir = tempfile.mkdtemp()
+        old_path = os.path.join(tmpdir, "old.json")
+        new_path = os.path.join(tmpdir, "new.json")
+        umask = os.umask(0o022)
+        try:
+            with open(old_path, "w", encoding="utf-8") as f:
+                f.write("[]")
+            os.chmod(old_path, 0o640)
+            self.dex.save_json(old_path)
+            self.assertEqual(os.stat(old_path).st_mode & 0o777, 0o640)
+            self.dex.save_json(new_path)
+            self.assertEqual(os.stat(new_path).st_mode & 0o777, 0o644)
+        finally:
+            os.umask(umask)
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+
+    def test_index_lookups(self):
+        """Test name/number/type lookups follow add, remove and basic-info updates."""
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+        self.assertIs(self.dex.find_by_name("BULBASAUR"), self.bulbasaur)
+        self.assertIs(self.dex.find_by_national_no("0004"), self.charmander)
+        self.assertEqual(self.dex.find_by_type("Fire"), [self.charmander])
+
+        self.dex.set_basic_info(self.charmander, "Charmander", "0005", "Lizard Pokémon",
+                                0.6, 8.5, ["Blaze"])
+        self.assertIs(self.dex.find_by_national_no("0005"), self.charmander)
+        with self.assertRaises(PokemonNotFoundError):
+            self.dex.find_by_national_no("0004")
+
+        # edits keep buckets in insertion order, including renames into a shared name
+        vulpix = Vulpix(national_no="0037", name="Vulpix")
+        self.dex.add(vulpix)
+        self.dex.set_basic_info(self.charmander, "Charmander", "0005", "Lizard Pokémon",
+                                0.7, 8.5, ["Blaze"])
+        self.assertEqual(self.dex.find_by_type("fire"), [self.charmander, vulpix])
+        self.dex.set_basic_info(self.bulbasaur, "Vulpix", "0001", "Seed Pokémon",
+                                0.7, 6.9, ["Overgrow"])
+        self.assertIs(self.dex.find_by_name("vulpix"), self.bulbasaur)
+        self.dex.set_basic_info(self.bulbasaur, "Bulbasaur", "0001", "Seed Pokémon",
+                                0.7, 6.9, ["Overgrow"])
+        self.dex.remove_by_name("vulpix")
+
+        self.assertTrue(self.dex.remove_by_name("bulbasaur"))
+        self.assertEqual(self.dex.find_by_type("grass"), [])
+        self.assertEqual(self.dex.count(), 1)
+
+        # the same object cannot be stored twice
+        with self.assertRaises(ValueError):
+            self.dex.add(self.charmander)
+        with self.assertRaises(ValueError):
+            self.dex.add_many([self.bulbasaur, self.bulbasaur])
+        self.assertEqual(self.dex.get_entries(), [self.charmander])
+
+        # copies and pickles get their own unattached stats and can be added
+        for clone in (copy.deepcopy(self.charmander), copy.copy(self.charmander),
+                      pickle.loads(pickle.dumps(self.charmander))):
+            self.dex.add(clone)
+            clone.get_stats().set_stat("hp", 1)
+        self.assertEqual(self.charmander.get_stats().get_stat("hp"), 39)
+        self.assertEqual(self.dex.type_moments("fire")["mean"]["hp"], (39 + 3) / 4)
+        self.assertLess(len(pickle.dumps(self.charmander)), 1000)   # not the whole store
+
+    def test_remove_keeps_insertion_order(self):
+        """Test removal by handle keeps the remaining entries in insertion order."""
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+        extra = Bulbasaur(national_no="0002", name="Ivysaur")
+        self.dex.add(extra)
+        h = self.dex.get_handle(extra)
+
+        self.assertTrue(self.dex.remove_by_national_no("0004"))
+        self.assertEqual(self.dex.get_entries(), [self.bulbasaur, extra])
+        self.assertIs(self.dex.get_by_handle(h), extra)
+
+    def test_streaming_json_and_jsonl(self):
+        """Test the incremental JSON reader across chunk boundaries and JSON Lines round trip."""
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+        expected = [p.to_dict() for p in self.dex.get_entries()]
+
+        tmpdir = tempfile.mkdtemp()
+        json_path = os.path.join(tmpdir, "dex.json")
+        jsonl_path = os.path.join(tmpdir, "dex.jsonl")
+        try:
+            self.dex.save_json(json_path)
+            with open(json_path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f), expected)
+            streamed = [p.to_dict() for p in Pokedex.iter_json(json_path, chunk_size=5)]
+            self.assertEqual(streamed, expected)
+
+            self.dex.save_jsonl(jsonl_path)
+            self.dex.load_jsonl(jsonl_path)
+            self.assertEqual([p.to_dict() for p in self.dex.get_entries()], expected)
+        finally:
+            for path in (json_path, jsonl_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            os.rmdir(tmpdir)
+
+    def test_snapshot_round_trip(self):
+        """Test save_snapshot/load_snapshot restore the same entries."""
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+        expected = [p.to_dict() for p in self.dex.get_entries()]
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdx") as tmpfile:
+            pdx_path = tmpfile.name
+
+        try:
+            self.dex.save_snapshot(pdx_path)
+            self.dex.entries = []
+            self.assertTrue(self.dex.load_snapshot(pdx_path))
+            self.assertEqual([p.to_dict() for p in self.dex.get_entries()], expected)
+        finally:
+            os.remove(pdx_path)
+
+    def test_lazy_snapshot_mode(self):
+        """Test lazy snapshot lookups decode on demand and the first change materializes."""
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+        expected = [p.to_dict() for p in self.dex.get_entries()]
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdx") as tmpfile:
+            pdx_path = tmpfile.name
+
+        try:
+            self.dex.save_snapshot(pdx_path)
+            self.dex.load_snapshot(pdx_path, lazy=True, cache_size=1)
+            self.assertTrue(self.dex.is_lazy())
+            self.assertEqual(self.dex.count(), 2)
+            charmander = self.dex.find_by_name("charmander")
+            self.assertEqual(charmander.to_dict(), expected[1])
+            self.assertEqual(self.dex.average_stats("Grass")["hp"], 45)
+            with self.assertRaises(TypeError):
+                charmander.get_stats().set_stat("hp", 500)     # lazy records are read-only
+
+            self.assertTrue(self.dex.update_by_name("Charmander", "hp", 40))
+            self.assertFalse(self.dex.is_lazy())
+            self.assertIs(self.dex.find_by_name("Charmander"), charmander)
+            self.assertEqual(charmander.get_stats().get_stat("hp"), 40)
+        finally:
+            self.dex.entries = []
+            os.remove(pdx_path)
+
+    def test_iter_text_streams_blocks(self):
+        """Test iter_text yields the same entries that save() wrote."""
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmpfile:
+            txt_path = tmpfile.name
+
+        try:
+            self.dex.save(txt_path)
+            rows = [p.to_row() for p in Pokedex.iter_text(txt_path)]
+            self.assertEqual(rows, [self.bulbasaur.to_row(), self.charmander.to_row()])
+        finally:
+            os.remove(txt_path)
+
+    def test_columnar_stats_aggregates(self):
+        """Test stats become store views and vectorized aggregates match the per-object loop."""
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+        self.dex.add(Charmander(national_no="0005", name="Charmeleon",
+                                stats=Stats(58, 64, 58, 80, 65, 80)))
+
+        self.charmander.get_stats().set_stat("hp", 41)
+        self.assertEqual(self.dex.average_stats("Fire"),
+                         FireType.calculate_average(self.dex.get_entries()))
+        summary = self.dex.stat_summary("fire")
+        self.assertEqual(summary["count"], 2)
+        self.assertEqual(summary["max"]["sp_atk"], 80)
+        self.assertEqual(summary["sum"]["total"], 41 + 52 + 43 + 60 + 50 + 65 + 405)
+
+        # a removed Pokémon keeps its values once detached from the store
+        self.dex.remove_by_name("Charmander")
+        self.assertEqual(self.charmander.get_stats().get_stat("hp"), 41)
+        self.assertEqual(self.dex.stat_summary("fire")["count"], 1)
+
+    def test_write_behind_coalesces_changes(self):
+        """Test write-behind only rewrites the file once the pending-change threshold is hit."""
+        tmpdir = tempfile.mkdtemp()
+        json_path = os.path.join(tmpdir, "dex.json")
+        try:
+            self.dex.save_json(json_path)
+            self.dex.enable_write_behind(max_pending=2, max_delay=3600)
+            self.dex.add(self.bulbasaur)
+            with open(json_path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f), [])
+            self.assertTrue(self.dex.dirty)
+
+            self.dex.add(self.charmander)
+            self.assertFalse(self.dex.dirty)
+            with open(json_path, encoding="utf-8") as f:
+                self.assertEqual(len(json.load(f)), 2)
+            self.assertEqual(os.listdir(tmpdir), ["dex.json"])
+        finally:
+            self.dex.disable_write_behind()
+            os.remove(json_path)
+            os.rmdir(tmpdir)
+
+    def test_journal_replay_and_compaction(self):
+        """Test journaled changes survive a reload and compaction folds them into the base."""
+        tmpdir = tempfile.mkdtemp()
+        json_path = os.path.join(tmpdir, "dex.json")
+        journal_path = Pokedex.journal_path(json_path)
+        try:
+            self.dex.add(self.bulbasaur)
+            self.dex.save_json(json_path)
+            self.dex.enable_journal()
+            self.dex.add(self.charmander)
+            self.dex.update_by_name("Bulbasaur", "speed", 99)
+            self.assertTrue(os.path.exists(journal_path))
+            expected = [p.to_dict() for p in self.dex.get_entries()]
+
+            self.dex.entries = []
+            self.dex.load_json(json_path)
+            self.assertEqual([p.to_dict() for p in self.dex.get_entries()], expected)
+
+            self.dex.compact()
+            self.assertFalse(os.path.exists(journal_path))
+            self.dex.load_json(json_path)
+            self.assertEqual([p.to_dict() for p in self.dex.get_entries()], expected)
+
+            # with no base file yet, the first change writes it and leaves nothing pending
+            os.remove(json_path)
+            self.dex.remove_by_name("Charmander")
+            self.assertTrue(os.path.exists(json_path))
+            self.assertFalse(self.dex.dirty)
+
+            # changes to duplicated names replay onto the same entry
+            twin = Bulbasaur(national_no="0001", name="Bulbasaur")
+            self.dex.add(twin)
+            self.dex.compact()
+            self.dex.update_by_name("Bulbasaur", "hp", 99)
+            self.dex.set_basic_info(twin, "Ivysaur", "0002", "Seed Pokémon", 1.0, 13.0, [])
+            self.dex.remove_by_national_no("0001")
+            expected = [p.to_dict() for p in self.dex.get_entries()]
+            self.dex.load_json(json_path)
+            self.assertEqual([p.to_dict() for p in self.dex.get_entries()], expected)
+        finally:
+            self.dex.disable_journal()
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+
+    def test_load_many_merges_shards(self):
+        """Test load_many merges shards in parallel and later shards win on duplicates."""
+        tmpdir = tempfile.mkdtemp()
+        first = os.path.join(tmpdir, "a.txt")
+        second = os.path.join(tmpdir, "b.json")
+        try:
+            self.dex.add(self.bulbasaur)
+            self.dex.add(self.charmander)
+            self.dex.save(first)
+            self.charmander.get_stats().set_stat("hp", 99)
+            self.dex.entries = [self.charmander]
+            self.dex.save_json(second)
+
+            self.assertEqual(self.dex.load_many([first, second], workers=2), 2)
+            self.assertEqual([p.get_name() for p in self.dex.get_entries()],
+                             ["Bulbasaur", "Charmander"])
+            self.assertEqual(self.dex.find_by_national_no("0004").get_stats().get_stat("hp"), 99)
+        finally:
+            for path in (first, second):
+                os.remove(path)
+            os.rmdir(tmpdir)
+
+    def test_fast_parser_handles_loose_formatting(self):
+        """Test the text parser tolerates spacing around keys and units after numbers."""
+        lines = ["Name: Ember Fox", "National Number:No. 77", "Type :  Fire ",
+                 "Height: 1.5\tm", "Weight: 20 kg", "Abilities: Blaze;Drought",
+                 "Stats:", "  HP : 50 pts", "  Speed:  90", "", "", "Stats: ignored"]
+        [p] = list(Pokedex._parse_lines(lines))
+        self.assertEqual(p.TYPE_NAME, "Fire")
+        self.assertEqual(p.get_national_no(), "0077")
+        self.assertEqual((p.get_height(), p.get_weight()), (1.5, 20.0))
+        self.assertEqual(p.get_stats().get_values(), [50, 0, 0, 0, 0, 90])
+
+    def test_chunked_text_load_matches_serial(self):
+        """Test the chunked parallel text loader returns the serial loader's entries in order."""
+        self.dex.entries = [Charmander(national_no=str(i).zfill(4), name=f"Mon{i}",
+                                       abilities=["Blaze"], stats=Stats(i, 1, 2, 3, 4, 5))
+                            for i in range(50)]
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmpfile:
+            txt_path = tmpfile.name
+
+        try:
+            self.dex.save(txt_path)
+            self.dex.load(txt_path)
+            serial = [p.to_row() for p in self.dex.get_entries()]
+            self.assertGreater(len(Pokedex.text_chunks(txt_path, 8)), 1)
+            self.dex.load(txt_path, workers=2)
+            self.assertEqual([p.to_row() for p in self.dex.get_entries()], serial)
+        finally:
+            os.remove(txt_path)
+
+    def test_metrics_are_opt_in(self):
+        """Test metrics record calls and file bytes only while enabled."""
+        Metrics.reset()
+        self.dex.add(self.bulbasaur)
+        self.dex.find_by_name("Bulbasaur")
+        self.assertEqual(self.dex.metrics(), {})
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as tmpfile:
+            json_path = tmpfile.name
+        Metrics.enable()
+        try:
+            self.dex.find_by_name("Bulbasaur")
+            with self.assertRaises(PokemonNotFoundError):
+                self.dex.find_by_name("Missingno")
+            self.dex.save_json(json_path)
+            m = self.dex.metrics(reset=True)
+            self.assertEqual(m["Pokedex.find_by_name"]["calls"], 2)
+            self.assertEqual(m["Pokedex.find_by_name"]["errors"], 1)
+            self.assertEqual(m["Pokedex.save_json"]["bytes_written"], os.path.getsize(json_path))
+            self.assertIn("p99_ms", m["Pokedex.find_by_name"])
+        finally:
+            Metrics.disable()
+            os.remove(json_path)
+        self.assertFalse(hasattr(Pokedex.find_by_name, "__wrapped__"))
+
+    def test_aggregate_cache_invalidation(self):
+        """Test cached type aggregates are refreshed after add, remove and direct set_stat."""
+        self.dex.add(self.charmander)
+        self.assertEqual(self.dex.average_stats("Fire")["hp"], 39)
+        self.assertEqual(self.dex.average_stats("Fire")["hp"], 39)     # served from cache
+
+        self.charmander.get_stats().set_stat("hp", 41)
+        self.assertEqual(self.dex.average_stats("Fire")["hp"], 41)
+        self.dex.add(Charmander(national_no="0005", name="Charmeleon",
+                                stats=Stats(59, 64, 58, 80, 65, 80)))
+        self.assertEqual(self.dex.average_stats("Fire")["hp"], 50)
+        self.dex.remove_by_national_no("0005")
+        self.assertEqual(self.dex.stat_summary("Fire")["count"], 1)
+
+    def test_running_type_moments(self):
+        """Test running sums give exact means/variances after add, set_stat and remove."""
+        self.dex.add(self.charmander)
+        self.dex.add(Charmander(national_no="0005", name="Charmeleon",
+                                stats=Stats(58, 64, 58, 80, 65, 80)))
+        self.dex.add(self.bulbasaur)
+        self.charmander.get_stats().set_stat("hp", 40)
+
+        m = self.dex.type_moments("Fire")
+        self.assertEqual(m["count"], 2)
+        self.assertEqual(m["mean"]["hp"], 49)
+        self.assertEqual(m["variance"]["hp"], 81)
+        self.assertEqual(m["std"]["hp"], 9)
+        self.assertEqual(self.dex.type_moments()["count"], 3)
+
+        self.dex.remove_by_name("Charmeleon")
+        m = self.dex.type_moments("fire")
+        self.assertEqual((m["mean"]["hp"], m["variance"]["hp"]), (40, 0))
+
+        # a Stats object already backing an entry cannot back a second one
+        twin = Charmander(national_no="0004", name="Twin", stats=self.charmander.get_stats())
+        with self.assertRaises(ValueError):
+            self.dex.add(twin)
+        with self.assertRaises(ValueError):
+            self.dex.add_many([twin])
+        self.assertEqual(self.dex.count(), 2)
+        self.assertEqual(self.dex.type_moments("fire")["count"], 1)
+
+    def test_type_registry_new_type(self):
+        """Test a type defined outside A3 works for loading, lookups and averages."""
+        class WaterType(BasePokemon, ABC):
+            __slots__ = ()
+            TYPE_NAME = "Water"
+            TYPE_INFO = "Water-type Pokémon."
+
+        class GenericWaterPokemon(WaterType):
+            __slots__ = ()
+            GENERIC = True
+
+            def display(self):
+                pass
+
+        for klass in (WaterType, GenericWaterPokemon):
+            self.addCleanup(TypeRegistry.unregister, klass)
+        self.assertEqual(TypeRegistry.type_names(), ["Fire", "Grass", "Water"])
+        squirtle = BasePokemon.from_dict({
+            "class": "Squirtle", "type": "Water", "national_no": "0007", "name": "Squirtle",
+            "species": "Tiny Turtle Pokémon", "height_m": 0.5, "weight_kg": 9.0,
+            "abilities": ["Torrent"], "stats": Stats(44, 48, 65, 50, 64, 43).as_dict()})
+        self.assertIsInstance(squirtle, GenericWaterPokemon)
+        self.assertEqual(squirtle.TYPE_KEY, "water")
+
+        self.dex.add(squirtle)
+        self.dex.add(self.charmander)
+        self.assertEqual([p.get_name() for p in self.dex.find_by_type("water")], ["Squirtle"])
+        self.assertEqual(WaterType.calculate_average(self.dex)["defense"], 65)
+        self.assertEqual(WaterType.calculate_average([squirtle, self.charmander])["hp"], 44)
+        self.assertEqual(FireType.calculate_average(self.dex)["hp"], 39)
+
+        TypeRegistry.unregister(GenericWaterPokemon)
+        self.assertIsNone(TypeRegistry.generic_class("water"))
+
+    def test_query(self):
+        """Test query filters, index lookups, ordering, top-k and rejection of unknown fields."""
+        fast = Charmander(national_no="0006", name="Charizard", height_m=1.7, weight_kg=90.5,
+                          stats=Stats(78, 84, 78, 109, 85, 100))
+        small = Charmander(national_no="0005", name="Charmeleon", height_m=1.1, weight_kg=19.0,
+                           stats=Stats(58, 64, 58, 80, 65, 80))
+        for p in (self.bulbasaur, self.charmander, fast, small):
+            self.dex.add(p)
+
+        names = lambda ps: [p.get_name() for p in ps]
+        self.assertEqual(names(self.dex.query(type="fire", speed__gte=80, weight__lt=50)),
+                         ["Charmeleon"])
+        self.assertEqual(names(self.dex.query(type="Fire", order_by="-total", limit=2)),
+                         ["Charizard", "Charmeleon"])
+        self.assertEqual(names(self.dex.query(order_by="national_no")),
+                         ["Bulbasaur", "Charmander", "Charmeleon", "Charizard"])
+        self.assertEqual(names(self.dex.query(hp__in=[39, 45])), ["Bulbasaur", "Charmander"])
+        self.assertEqual(names(self.dex.query(name="charizard", type="grass")), [])
+
+        self.dex.remove_by_name("Charmander")
+        self.dex.add(self.charmander)       # reuses the freed store row, but is now last
+        self.assertEqual(names(self.dex.query(type="fire")),
+                         ["Charizard", "Charmeleon", "Charmander"])
+        with self.assertRaises(ValueError):
+            self.dex.query(colour="red")
+
+    def test_sorted_stat_indexes(self):
+        """Test range and top-k by stat stay correct after set_stat, add and remove."""
+        small = Charmander(national_no="0005", name="Charmeleon",
+                           stats=Stats(58, 64, 58, 80, 65, 80))
+        for p in (self.bulbasaur, self.charmander, small):
+            self.dex.add(p)
+        names = lambda ps: [p.get_name() for p in ps]
+
+        self.assertEqual(names(self.dex.range_by_stat("hp", 40, 60)), ["Bulbasaur", "Charmeleon"])
+        self.assertEqual(names(self.dex.top_by_stat("total", 2)), ["Charmeleon", "Bulbasaur"])
+
+        self.charmander.get_stats().set_stat("hp", 45)      # ties keep insertion order
+        self.assertEqual(names(self.dex.range_by_stat("hp", 45, 45)), ["Bulbasaur", "Charmander"])
+        self.assertEqual(names(self.dex.top_by_stat("total", 2)), ["Charmeleon", "Bulbasaur"])
+        self.dex.remove_by_name("Bulbasaur")
+        self.assertEqual(names(self.dex.range_by_stat("hp", high=50)), ["Charmander"])
+        self.assertEqual(names(self.dex.top_by_stat("speed", 5)), ["Charmeleon", "Charmander"])
+        with self.assertRaises(ValueError):
+            self.dex.top_by_stat("luck")
+
+    def test_prefix_and_fuzzy_search(self):
+        """Test autocomplete and typo-tolerant search, including index upkeep on changes."""
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+        names = lambda ps: [p.get_name() for p in ps]
+
+        self.assertEqual(self.dex.complete("char"), ["Charmander"])
+        self.assertEqual(names(self.dex.search("Charmandr")), ["Charmander"])
+        self.assertEqual(names(self.dex.search("bulbsaur")), ["Bulbasaur"])
+        self.assertEqual(names(self.dex.search("blaze", fields=("abilities",))), ["Charmander"])
+        self.assertEqual(names(self.dex.search("lizard pokemon")), ["Charmander"])
+        self.assertEqual(self.dex.search("xyzzy"), [])
+
+        charmeleon = Charmander(national_no="0005", name="Charmeleon")
+        self.dex.add(charmeleon)
+        self.assertEqual(self.dex.complete("CHARM"), ["Charmander", "Charmeleon"])
+        self.dex.set_basic_info(charmeleon, "Charizard", "0006", "Flame Pokémon", 1.7, 90.5,
+                                ["Blaze"])
+        self.assertEqual(self.dex.complete("charm"), ["Charmander"])
+        self.assertEqual(names(self.dex.search("charizrd")), ["Charizard"])
+        self.dex.remove_by_name("Charmander")
+        self.assertEqual(names(self.dex.search("blaze", fields=("abilities",))), ["Charizard"])
+
+    def test_ability_and_species_index(self):
+        """Test find_by_ability/find_by_species with AND/OR, kept in sync on changes."""
+        vulpix = Charmander(national_no="0037", name="Vulpix", species="Fox Pokémon",
+                            abilities=["Flash Fire", "Drought"])
+        self.dex.add(self.bulbasaur)
+        self.dex.add(self.charmander)
+        self.dex.add(vulpix)
+        names = lambda ps: [p.get_name() for p in ps]
+
+        self.assertEqual(names(self.dex.find_by_ability("flash fire")), ["Vulpix"])
+        self.assertEqual(names(self.dex.find_by_ability("Blaze", "Flash Fire", match="any")),
+                         ["Charmander", "Vulpix"])
+        self.assertEqual(self.dex.find_by_ability("Blaze", "Flash Fire"), [])
+        self.assertEqual(names(self.dex.find_by_species("seed pokémon", "Fox Pokémon")),
+                         ["Bulbasaur", "Vulpix"])
+        self.assertEqual(names(self.dex.query(ability="Drought", type="fire")), ["Vulpix"])
+
+        self.dex.set_basic_info(vulpix, "Vulpix", "0037", "Fox Pokémon", 0.6, 9.9, ["Blaze"])
+        self.assertEqual(self.dex.find_by_ability("Flash Fire"), [])
+        self.assertEqual(names(self.dex.find_by_ability("blaze")), ["Charmander", "Vulpix"])
+        self.dex.remove_by_national_no("0004")
+        self.assertEqual(names(self.dex.find_by_ability("Blaze")), ["Vulpix"])
+
+        tmpdir = tempfile.mkdtemp()
+        path = os.path.join(tmpdir, "dex.pdx")
+        try:
+            self.dex.save_snapshot(path)
+            self.dex.load_snapshot(path, lazy=True)
+            self.assertEqual(names(self.dex.find_by_ability("BLAZE", "blaze")), ["Vulpix"])
+            self.assertEqual(names(self.dex.find_by_species("Seed Pokémon")), ["Bulbasaur"])
+        finally:
+            self.dex.entries = []       # closes the memory-mapped snapshot
+            if os.path.exists(path):
+                os.remove(path)
+            os.rmdir(tmpdir)
+
+    def test_bulk_import_csv_and_jsonl(self):
+        """Test CSV/JSONL imports add valid rows in one batch and report rejected rows."""
+        tmpdir = tempfile.mkdtemp()
+        csv_path = os.path.join(tmpdir, "dex.csv")
+        jsonl_path = os.path.join(tmpdir, "dex.jsonl")
+        try:
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("national_no,name,type,species,height_m,weight_kg,abilities,"
+                        "hp,attack,defense,sp_atk,sp_def,speed,total\n")
+                f.write("No. 0037,Vulpix,Fire,Fox Pokémon,0.6 m,9.9,Flash Fire;Drought,"
+                        "38,41,40,50,65,65,299\n")
+                f.write("37,Bad No,Fire,Fox Pokémon,0.6,9.9,,1,1,1,1,1,1,6\n")
+                f.write("0043,Oddish,Grass,Weed Pokémon,0.5,5.4,Chlorophyll,45,50,55,75,65,30,320\n")
+                f.write("0007,Squirtle,Plasma,Tiny Turtle Pokémon,0.5,9,Torrent,44,48,65,50,64,x,0\n")
+            version = self.dex._stats.version
+            report = self.dex.import_csv(csv_path)
+            self.assertEqual(report["added"], 2)
+            self.assertEqual([row for row, _ in report["errors"]], [3, 5])
+            self.assertIn("national_no", report["errors"][0][1])
+            self.assertIn("speed", report["errors"][1][1])
+            self.assertIn("type", report["errors"][1][1])
+            self.assertEqual(self.dex._stats.version, version + 1)     # one aggregate update
+            self.assertEqual(self.dex.find_by_ability("drought")[0].get_weight(), 9.9)
+            self.assertEqual(self.dex.average_stats("Grass")["sp_atk"], 75)
+
+            self.dex.save_jsonl(jsonl_path)
+            with open(jsonl_path, "a", encoding="utf-8") as f:
+                f.write("{not json\n")
+            self.dex.entries = [self.charmander]
+            report = self.dex.import_jsonl(jsonl_path)
+            self.assertEqual((report["added"], [row for row, _ in report["errors"]]), (2, [3]))
+            self.assertEqual([p.get_name() for p in self.dex.get_entries()],
+                             ["Charmander", "Vulpix", "Oddish"])
+            self.assertEqual(self.dex.type_moments("fire")["count"], 2)
+        finally:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+
+    def test_import_strips_text_fields(self):
+        """Test padded fields import the same whether or not other rows are rejected."""
+        row = {"national_no": " 0001 ", "name": " Bulbasaur", "type": "Grass ",
+               "species": "Seed Pokémon ", "height_m": "0.7", "weight_kg": "6.9",
+               "abilities": " Overgrow ", "hp": "45", "attack": "49", "defense": "49",
+               "sp_atk": "65", "sp_def": "65", "speed": "45"}
+        for batch in ([row], [row, dict(row, name="Bad-Name")]):
+            self.dex.entries = []
+            self.dex.import_rows(batch)
+            p = self.dex.get_entries()[0]
+            self.assertIsInstance(p, Bulbasaur)
+            self.assertEqual((p.get_name(), p.get_national_no(), p.get_species(), p.get_abilities()),
+                             ("Bulbasaur", "0001", "Seed Pokémon", ("Overgrow",)))
+
+    def test_columnar_export(self):
+        """Test export_csv/export_npz columns match to_row() and the CSV re-imports."""
+        tmpdir = tempfile.mkdtemp()
+        csv_path = os.path.join(tmpdir, "dex.csv")
+        npz_path = os.path.join(tmpdir, "dex.npz")
+        try:
+            self.dex.add(self.bulbasaur)
+            self.dex.add(self.charmander)
+            self.charmander.get_stats().set_stat("speed", 70)
+            rows = [p.to_row() for p in self.dex.get_entries()]
+            self.dex.export_csv(csv_path, chunk_size=1)
+            self.dex.export_npz(npz_path, chunk_size=1)
+
+            with np.load(npz_path) as bundle:
+                self.assertEqual(bundle["name"].tolist(), ["Bulbasaur", "Charmander"])
+                self.assertEqual(bundle["speed"].tolist(), [45, 70])
+                self.assertEqual(bundle["total"].tolist(), [int(r["total"]) for r in rows])
+                self.assertEqual(bundle["weight_kg"].tolist(), [6.9, 8.5])
+                self.assertEqual(bundle["abilities"].tolist(), ["Overgrow", "Blaze"])
+
+            self.dex.entries = []
+            self.assertEqual(self.dex.import_csv(csv_path)["added"], 2)
+            self.assertEqual([p.to_row() for p in self.dex.get_entries()], rows)
+        finally:
+            for name in os.listdir(tmpdir):
+                os.remove(os.path.join(tmpdir, name))
+            os.rmdir(tmpdir)
+
+    def test_render_all(self):
+        """Test batch chart rendering in-process and with workers, skipping empty pies."""
+        tmpdir = tempfile.mkdtemp()
+        try:
+            empty = Charmander(national_no="0005", name="Mr Empty")
+            self.dex.add(self.bulbasaur)
+            self.dex.add(empty)
+            paths = Visualizer.render_all(self.dex, out_dir=tmpdir)
+            self.assertEqual([os.path.basename(p) for p in paths],
+                             ["0_Bulbasaur_bar.png", "0_Bulbasaur_pie.png", "1_Mr_Empty_bar.png"])
+            for path in paths:
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+
+            paths = Visualizer.render_all([self.charmander, self.bulbasaur], kinds=["pie"],
+                                          out_dir=os.path.join(tmpdir, "pies"), workers=2)
+            self.assertEqual([os.path.basename(p) for p in paths],
+                             ["0_Charmander_pie.png", "1_Bulbasaur_pie.png"])
+            with self.assertRaises(ValueError):
+                Visualizer.render_all(self.dex, kinds=["radar"], out_dir=tmpdir)
+        finally:
+            for root, dirs, files in os.walk(tmpdir, topdown=False):
+                for name in files:
+                    os.remove(os.path.join(root, name))
+                os.rmdir(root)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file